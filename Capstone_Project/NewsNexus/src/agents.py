@@ -1,26 +1,149 @@
+import os
+import re
+import json
+import time
+import threading
+from html import escape
 import operator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Annotated, List, TypedDict
 
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 
 # Import our tools and LLM setup from Phase 2
 from tools import get_llm_with_tools, lookup_policy_docs, web_search_stub, rss_feed_search
+from tools import policy_doc_records, web_search_records, rss_records
+from findings import FindingDeduper, render_findings
+from llm_cache import CachedChatModel
+from compression import compress_findings
+from token_budget import NODE_TOKEN_BUDGETS, count_tokens, fit_to_budget, usage_record
+from revision import revise_draft, strip_code_fences
+from checkpointer import get_checkpointer
+from ollama_models import resolve_route, build_chat_model
+from tracing import traced_node, bind_context, span, trace_id_from
+from blob_store import offload, offload_json, resolve, resolve_json, message_text
+import deadline
+from deadline import degradation, route_override, smaller_model
 
 # --- 1. Define the State (Enhanced for Visualization) ---
 # AgentState is a custom TypedDict that defines the structure of data flowing between nodes.
 class AgentState(TypedDict):
     # operator.add ensures we append new messages instead of overwriting existing ones.
     messages: Annotated[List[BaseMessage], operator.add]
+    # Long text below is kept in the blob store and held here as a reference (see blob_store.py):
+    # research_data items, the findings list and Analyst/Writer/Reviser message content.
     research_data: List[str]
+    findings: List[dict] # Structured, deduplicated research records (see findings.py)
+    research_stats: dict # Tool calls planned/issued/saved and why research stopped
+    token_usage: Annotated[List[dict], operator.add] # Prompt/completion tokens per node call (see token_budget.py)
     chart_data: List[dict] # New: Stores structured data for Plotly
+    degradations: Annotated[List[dict], operator.add] # What each node cut to meet the run's deadline (see deadline.py)
 
 # Initialize Resources
-llm, llm_with_tools, tools = get_llm_with_tools()
+# The main LLM, the tool-bound LLM, the tool list and the compiled graph are built on
+# first use (see __getattr__ at the bottom), so importing this module does not load the
+# Ollama clients or open the checkpointer. `from agents import app` still works.
+_lazy_lock = threading.RLock()
+
+def _init_models():
+    with _lazy_lock:
+        if "llm_with_tools" in globals():
+            return
+        base_llm, with_tools, tool_list = get_llm_with_tools()
+        # Planner, Analyst and Writer all run at temperature=0, so identical prompts are
+        # answered from a persistent response cache (and concurrent duplicates coalesce).
+        globals().setdefault("llm", CachedChatModel(base_llm))  # keep a model patched in (benchmark.py)
+        globals().update(llm_with_tools=with_tools, tools=tool_list)
+
+def main_llm():
+    """The cached main chat model (`agents.llm`)."""
+    if "llm" not in globals():
+        _init_models()
+    return globals()["llm"]
+
+_routed_models = {}
+_routed_models_lock = threading.Lock()
+
+def llm_for(node: str, config=None):
+    """
+    The cached chat model for one stage, per MODEL_ROUTES in ollama_models.py
+    plus any per-run override in config["configurable"]["models"].
+    One client is built per distinct (model, parameters) route.
+    """
+    route = resolve_route(node, config)
+    key = json.dumps(route, sort_keys=True)
+    with _routed_models_lock:
+        if key not in _routed_models:
+            _routed_models[key] = CachedChatModel(build_chat_model(**route))
+        return _routed_models[key]
+
+# Max tool calls the Researcher runs at once: the RAG lookup plus up to four web/RSS
+# calls. Calls beyond that first burst wait only until MIN_CALLS_BEFORE_STOP calls have
+# answered; then each returned call releases the next one unless the plan has stopped
+# paying off (no waiting for a whole round to finish).
+RESEARCH_WORKERS = int(os.getenv("NEWSNEXUS_RESEARCH_WORKERS", 5))
+# Adaptive early stopping: once the share of genuinely new findings over the last
+# NOVELTY_WINDOW answered calls drops below NOVELTY_THRESHOLD, or SOURCE_BUDGET unique
+# findings are collected, no further web/RSS calls are issued. Failed or timed-out
+# calls carry no novelty signal and are left out. Threshold 0 disables it.
+NOVELTY_THRESHOLD = float(os.getenv("NEWSNEXUS_NOVELTY_THRESHOLD", 0.2))
+NOVELTY_WINDOW = 2
+MIN_CALLS_BEFORE_STOP = 2
+SOURCE_BUDGET = int(os.getenv("NEWSNEXUS_SOURCE_BUDGET", 40))
+# Hard ceiling (seconds) on the whole tool fan-out; individual tools have their own deadlines.
+RESEARCH_DEADLINE = float(os.getenv("NEWSNEXUS_RESEARCH_DEADLINE", 30))
+# Section-parallel Writer: an outline call picks the headline and section headings, then
+# up to WRITER_PARALLELISM sections are written at once and stitched together in order.
+# Match it to the Ollama server's OLLAMA_NUM_PARALLEL; 1 skips the outline and writes
+# the whole issue in a single pass.
+WRITER_PARALLELISM = int(os.getenv("NEWSNEXUS_WRITER_PARALLELISM", os.getenv("OLLAMA_NUM_PARALLEL", 4)))
+WRITER_MAX_SECTIONS = 6
 
 # --- 2. Define the Nodes / Agent Personas ---
 
-def researcher_node(state: AgentState):
+def _stream_writer():
+    """LangGraph's custom-stream writer when running inside a graph, else a no-op."""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except Exception:
+        return lambda chunk: None
+
+def generate_streaming(node: str, prompt: str, section: int = None, emit=None, chat_model=None):
+    """
+    Runs the LLM token by token and forwards each delta as a custom stream event
+    ({"node", "delta"}, plus "section" for a newsletter section), so a UI using
+    stream_mode="custom" can render the text live. Returns the complete message
+    once generation ends. Worker threads must be handed the node's `emit`, since
+    the stream writer is only reachable from the node's own thread.
+    `chat_model` is the routed model for the stage (default: the main model).
+    """
+    emit = emit or _stream_writer()
+    full = None
+    for chunk in (chat_model or main_llm()).stream(prompt):
+        full = chunk if full is None else full + chunk
+        if chunk.content:
+            event = {"node": node, "delta": chunk.content}
+            if section is not None:
+                event["section"] = section
+            emit(event)
+    if full is None:
+        return AIMessage(content="")
+    return AIMessage(content=full.content, usage_metadata=getattr(full, "usage_metadata", None),
+                     response_metadata=full.response_metadata)
+
+def _offloaded(message: AIMessage) -> AIMessage:
+    """The message as it goes into state: long content replaced by a blob reference."""
+    content = offload(message.content)
+    if content is message.content:
+        return message
+    return AIMessage(content=content, usage_metadata=getattr(message, "usage_metadata", None),
+                     response_metadata=getattr(message, "response_metadata", None) or {})
+
+@traced_node("Researcher")
+def researcher_node(state: AgentState, config=None):
     """
     Agent 1: Researcher (Enhanced with Dynamic Orchestration)
     Responsibility: Create an elaborate research plan and execute detailed sub-queries.
@@ -32,13 +155,21 @@ def researcher_node(state: AgentState):
     print(f"   > Topic: {topic}")
     
     # 1. Ask the LLM to break down the topic into an advanced research plan
-    plan_prompt = f"""You are an elite Research Director. 
+    def build_plan_prompt(topic):
+        return f"""You are an elite Research Director. 
 The user wants an elaborate and advanced level report on: '{topic}'.
 Break this topic down into exactly 3 specific, diverse search queries that cover different angles (e.g., technical, market, news).
 Just output the 3 queries separated by a pipe character (|). Do not include any other text or explanation."""
     
+    # A pasted-in brief can be long; keep the planner prompt inside its budget.
+    plan_budget = NODE_TOKEN_BUDGETS["planner"]
+    kept, plan_trimmed = fit_to_budget([(0, topic)], plan_budget - count_tokens(build_plan_prompt("")))
+    plan_prompt = build_plan_prompt(kept[0] if kept else "")
+    
+    token_usage = []
     try:
-        plan_response = llm.invoke(plan_prompt)
+        plan_response = llm_for("planner", config).invoke(plan_prompt)
+        token_usage.append(usage_record("planner", plan_prompt, plan_response, plan_budget, plan_trimmed))
         content = plan_response.content.replace('\n', '')
         queries = [q.strip() for q in content.split('|') if q.strip()]
         if len(queries) < 1: 
@@ -51,60 +182,194 @@ Just output the 3 queries separated by a pipe character (|). Do not include any
     queries = queries[:3]
     print(f"   > Research Plan Queries: {queries}")
 
-    research_findings = []
-    
-    # 2. Iterate through queries and force comprehensive data gathering using our tools directly
-    for i, q in enumerate(queries, 1):
-        print(f"   > [Executing Phase {i}/3] Searching for angle: {q}")
-        
-        # Web Search
-        try:
-            web_res = web_search_stub.invoke(q)
-            if "0 results" not in web_res and "Error" not in web_res:
-                research_findings.append(f"Source: Web Search (Query: {q})\nData: {web_res}")
-        except Exception as e:
-            print(f"     > Web Search error: {e}")
-            
-        # RSS Search
+    # Deadline: the fan-out may only use the time the Analyst and Writer do not need,
+    # and under pressure RSS is dropped and fewer research items are kept.
+    degradations = []
+    research_deadline = RESEARCH_DEADLINE
+    source_budget = SOURCE_BUDGET
+    time_left = deadline.time_left(config)
+    if time_left is not None:
+        available = max(time_left - deadline.reserve_after("Researcher"), deadline.MIN_RESEARCH_SECONDS)
+        if available < research_deadline:
+            research_deadline = available
+            degradations.append(degradation("Researcher", "research_deadline", config, seconds=round(available, 1)))
+        if deadline.pressure(config, "Researcher") == deadline.CRITICAL and source_budget > deadline.DEGRADED_SOURCE_BUDGET:
+            source_budget = deadline.DEGRADED_SOURCE_BUDGET
+            degradations.append(degradation("Researcher", "cap_research_items", config, items=source_budget))
+
+    # 2. Run the tool calls on a bounded pool, up to RESEARCH_WORKERS at once.
+    #    Results are consumed in plan order (deterministic), and before a held-back
+    #    call is issued we check whether the plan is still producing new material.
+    calls = deque()
+    for q in queries:
+        calls.append((web_search_records, q))
+        calls.append((rss_records, q))
+    calls_planned = len(calls) + 1
+
+    def skip_rss():
+        """Drops the RSS calls not yet issued; returns how many."""
+        remaining = [call for call in calls if call[0] is not rss_records]
+        skipped = len(calls) - len(remaining)
+        if skipped:
+            calls.clear()
+            calls.extend(remaining)
+            degradations.append(degradation("Researcher", "skip_rss", config, calls=skipped))
+        return skipped
+
+    if deadline.pressure(config, "Researcher") in (deadline.TIGHT, deadline.CRITICAL):
+        skip_rss()
+
+    print(f"   > Dispatching up to {calls_planned} tool calls across {min(RESEARCH_WORKERS, calls_planned)} workers...")
+    executor = ThreadPoolExecutor(max_workers=RESEARCH_WORKERS, thread_name_prefix="researcher")
+    # 3. Always check internal docs for the MAIN topic (RAG); it is never skipped.
+    rag_future = executor.submit(bind_context(policy_doc_records), topic)
+    fanout_deadline = time.time() + research_deadline
+
+    deduper = FindingDeduper()
+    raw_count = 0
+    calls_issued = 1
+    recent_novelty = deque(maxlen=NOVELTY_WINDOW)
+    calls_answered = 0
+    stop_reason = None
+    in_flight = deque()
+    slots = max(RESEARCH_WORKERS - 1, 1)  # one worker is kept for the RAG lookup
+
+    def collect(fn, arg, future):
+        """Waits for one call within the research deadline; returns its findings, or None if it failed."""
         try:
-            rss_res = rss_feed_search.invoke(q)
-            if "No matching" not in rss_res:
-                research_findings.append(f"Source: RSS Feeds (Query: {q})\nData: {rss_res}")
+            return future.result(timeout=max(fanout_deadline - time.time(), 0))
+        except FutureTimeout:
+            print(f"     > {fn.__name__} for '{arg}' missed the {research_deadline:.0f}s research deadline, skipping.")
         except Exception as e:
-            print(f"     > RSS error: {e}")
-            
-    # 3. Always check internal docs for the MAIN topic (RAG)
+            print(f"     > {fn.__name__} error for '{arg}': {e}")
+        return None
+
+    def issue(count):
+        nonlocal calls_issued
+        for _ in range(min(count, len(calls), slots - len(in_flight))):
+            fn, arg = calls.popleft()
+            in_flight.append((fn, arg, executor.submit(bind_context(fn), arg)))
+            calls_issued += 1
+
     try:
-        doc_res = lookup_policy_docs.invoke(topic)
-        if "No relevant" not in doc_res:
-             research_findings.append(f"Source: Internal Database (Topic: {topic})\nData: {doc_res}")
-    except Exception:
-        pass
+        issue(slots)
+        while in_flight:
+            fn, arg, future = in_flight.popleft()
+            results = collect(fn, arg, future)
+            if results:
+                # A failed, timed-out or empty call (a rate-limited search, an RSS query
+                # with no match) says nothing about novelty, so only calls with results count.
+                raw_count += len(results)
+                new = sum(1 for finding in results if deduper.add(finding))
+                recent_novelty.append(new / len(results))
+                calls_answered += 1
+
+            # Decide whether the remaining planned calls are still worth issuing.
+            if calls and deadline.pressure(config, "Researcher") in (deadline.TIGHT, deadline.CRITICAL):
+                skip_rss()  # the skipped calls count as saved in research_stats
+            if stop_reason is None and calls:
+                if time.time() >= fanout_deadline:
+                    # A call issued now could only be waited on for 0s and dropped while it still runs.
+                    stop_reason = "research deadline reached"
+                elif len(deduper.kept) >= source_budget:
+                    stop_reason = f"source budget of {source_budget} reached"
+                elif (NOVELTY_THRESHOLD > 0 and calls_answered >= MIN_CALLS_BEFORE_STOP
+                        and sum(recent_novelty) / len(recent_novelty) < NOVELTY_THRESHOLD):
+                    stop_reason = f"novelty fell below {NOVELTY_THRESHOLD:.0%}"
+                if stop_reason:
+                    print(f"   > Early stop: {stop_reason}; skipping {len(calls)} remaining calls.")
+
+            # Only the calls that could still be saved are held back, and only until the
+            # novelty check has evidence; from then on each returned call releases one.
+            if calls and stop_reason is None:
+                if NOVELTY_THRESHOLD <= 0 or not in_flight:
+                    issue(slots)
+                elif calls_answered >= MIN_CALLS_BEFORE_STOP:
+                    issue(1)
+
+        rag_results = collect(policy_doc_records, topic, rag_future) or []
+        raw_count += len(rag_results)
+        for finding in rag_results:
+            deduper.add(finding)
+    finally:
+        # Don't block on stragglers; the deadline has already decided their fate.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # 4. The same article often comes back from several queries and from both web
+    #    and RSS; the deduper kept one copy so the Analyst prompt carries no duplicates.
+    findings = deduper.kept
+    if source_budget < SOURCE_BUDGET:
+        findings = findings[:source_budget]
+    research_stats = {
+        "calls_planned": calls_planned,
+        "calls_issued": calls_issued,
+        "calls_saved": calls_planned - calls_issued,
+        "raw_results": raw_count,
+        "unique_findings": len(findings),
+        "stop_reason": stop_reason or "plan completed",
+    }
+    print(f"   > Deduplicated {raw_count} raw results into {len(findings)} unique findings "
+          f"({research_stats['calls_saved']} tool calls saved).")
+    research_findings = render_findings(findings)
 
     if not research_findings:
         research_findings.append("AGENT: Could not find significant new data. Returning base knowledge.")
 
     print(f"   > Researcher found {len(research_findings)} comprehensive items.")
     
-    from langchain_core.messages import AIMessage
-    msg = AIMessage(content=f"I have completed a comprehensive research plan using {len(queries)} diverse queries: {', '.join(queries)}. I found {len(research_findings)} distinct data sources.")
+    msg = AIMessage(content=f"I have completed a comprehensive research plan using {len(queries)} diverse queries: {', '.join(queries)}. I found {len(findings)} unique findings across {len(research_findings)} source groups and skipped {research_stats['calls_saved']} redundant tool calls ({research_stats['stop_reason']}).")
 
+    # Only references go into state (and every checkpoint); the text sits in the blob store once.
     return {
         "messages": [msg], 
-        "research_data": research_findings
+        "research_data": [offload(item) for item in research_findings],
+        "findings": offload_json(findings),
+        "research_stats": research_stats,
+        "token_usage": token_usage,
+        "degradations": degradations,
     }
 
-def analyst_node(state: AgentState):
+@traced_node("Analyst")
+def analyst_node(state: AgentState, config=None):
     """
     Agent 2: Analyst (Enhanced with Data Extraction)
     Responsibility: Identify key trends AND extract numeric data for plotting.
     """
     print("\n--- [Agent: Analyst] is identifying trends ---")
-    raw_data = "\n\n".join(state["research_data"])
+    # Deadline: a tighter completion limit when short of time; when critical, also the
+    # small model and no condensing pass (trimming below still bounds the prompt).
+    degradations = []
+    analyst_config = config
+    level = deadline.pressure(config, "Analyst")
+    if level in (deadline.TIGHT, deadline.CRITICAL):
+        num_predict = deadline.DEGRADED_NUM_PREDICT["analyst"]
+        analyst_config = route_override(analyst_config, "analyst", num_predict=num_predict)
+        degradations.append(degradation("Analyst", "analyst_tokens", config, num_predict=num_predict))
+    if level == deadline.CRITICAL:
+        smaller = smaller_model(analyst_config, "analyst")
+        if smaller:
+            analyst_config = smaller
+            degradations.append(degradation("Analyst", "smaller_model", config, model=deadline.SMALL_MODEL))
+
+    findings = resolve_json(state.get("findings"))
+    compression_usage = []
+    if findings and level == deadline.CRITICAL:
+        degradations.append(degradation("Analyst", "skip_compression", config))
+        findings = None
+    if findings:
+        # Condense oversized research (map: per source group in parallel, reduce: join)
+        # so prompt processing stays bounded; citations are kept as numbered links.
+        blocks, compression_stats = compress_findings(findings, llm_for("compressor", config))
+        compression_usage = compression_stats["token_usage"]
+        # Trim priority: internal documents first, then earlier plan queries.
+        sections = [(100 if b["source"] == "rag" else 50 - i, b["text"]) for i, b in enumerate(blocks)]
+    else:
+        sections = [(-i, resolve(item)) for i, item in enumerate(state["research_data"])]
     
     # Note: We use a standard LLM invocation here (no tools bound)
     # because the Analyst only needs to think, not act.
-    prompt = f"""You are a senior expert analyst. 
+    def build_prompt(raw_data):
+        return f"""You are a senior expert analyst. 
     1. Provide an elaborative, advanced synthesis of the raw data. Identify 4-5 key trends and explain their deep implications.
     2. DATA VIZ EXTRACTION: Look for REAL numeric trends (percentages, market sizes, years).
        If you find numeric data, extract it into a JSON block like this:
@@ -118,15 +383,22 @@ def analyst_node(state: AgentState):
     {raw_data}
     """
     
+    # Enforce the node's token budget so the prompt never silently overflows the context window.
+    budget = NODE_TOKEN_BUDGETS["analyst"]
+    kept, trimmed = fit_to_budget(sections, budget - count_tokens(build_prompt("")))
+    if trimmed:
+        print(f"   > Analyst prompt over {budget} tokens; trimmed {trimmed} lowest-priority research sections.")
+    raw_data = "\n\n".join(kept)
+    prompt = build_prompt(raw_data)
+    
     print(f"   > Analyst node invoking base LLM with {len(raw_data)} chars of raw data...")
-    response = llm.invoke(prompt)
+    response = generate_streaming("Analyst", prompt, chat_model=llm_for("analyst", analyst_config))
     print(f"   > Analyst response received.")
+    usage = usage_record("analyst", prompt, response, budget, trimmed)
     content = response.content
     
     # Extract JSON if present for Plotly
     chart_data = []
-    import json
-    import re
     json_match = re.search(r'```json\n(.*?)\n```', content, re.DOTALL)
     if json_match:
         try:
@@ -134,17 +406,62 @@ def analyst_node(state: AgentState):
         except:
             pass
             
-    return {"messages": [response], "chart_data": chart_data}
+    return {"messages": [_offloaded(response)], "chart_data": chart_data, "token_usage": compression_usage + [usage],
+            "degradations": degradations}
+
+OUTLINE_PROMPT = """You are an elite technology newsletter editor planning a premium deep-dive issue.
+    Read the analysis below and plan the newsletter. Reply in plain text only, no HTML:
+    HEADLINE: <the newsletter headline>
+    followed by 3-{max_sections} section headings as a numbered list ("1. Overview"), one per line,
+    in reading order (an overview first, an outlook or takeaway last). Every key trend must belong to a section.
+    
+    TRENDS & ANALYSIS:
+    {analyst_insight}
+    """
+
+SECTION_PROMPT = """You are an elite technology newsletter editor writing one section of a premium Substack or TechCrunch style deep-dive titled "{headline}".
+    The full issue has these sections, in order: {outline}.
+    Write ONLY the section "{heading}". Start with <h2>{heading}</h2>, then use semantic HTML, bullet points and sophisticated language.
+    Cover only what belongs in this section; the other sections are written separately.
+    
+    CRITICAL: Preserve every link from the analysis that supports this section (e.g., [Title](URL)).
+    Format them as clickable <a> tags in the HTML. DO NOT wrap the output in markdown code blocks (e.g. ```html), ONLY return raw HTML.
+    
+    TRENDS & ANALYSIS:
+    {analyst_insight}
+    """
 
-def writer_node(state: AgentState):
+def _parse_outline(text: str):
+    """
+    Outline reply -> (headline, [section headings]). Only numbered or bulleted
+    lines count as headings, so preambles and commentary are ignored.
+    """
+    headline, headings = "", []
+    for line in text.splitlines():
+        plain = re.sub(r"^\s*[-*#>]*\s*", "", line).strip("*_ ")
+        if plain.lower().startswith("headline:"):
+            headline = plain.split(":", 1)[1].strip().strip("*_\"'")
+            continue
+        item = re.match(r"^\s*(?:\d+[.)]|[-*\u2022])\s+(.+)$", line)
+        if not item:
+            continue
+        heading = item.group(1).strip().strip("*_\"'").strip()
+        if heading and not heading.endswith(":") and len(heading) <= 120 and heading not in headings:
+            headings.append(heading)
+    return headline, headings[:WRITER_MAX_SECTIONS]
+
+@traced_node("Writer")
+def writer_node(state: AgentState, config=None):
     """
     Agent 3: Writer (Enhanced for Citations)
     Responsibility: Format analysis into HTML while preserving deep links.
+    Outline first, then the sections are written concurrently and assembled in order.
     """
     print("\n--- [Agent: Writer] is formatting the newsletter ---")
-    analyst_insight = state["messages"][-1].content
+    analyst_insight = message_text(state["messages"][-1])
     
-    prompt = f"""You are an elite technology newsletter editor. 
+    def build_prompt(analyst_insight):
+        return f"""You are an elite technology newsletter editor. 
     Compile the advanced analysis into an elaborate, professional HTML format.
     Make it look like a premium Substack or TechCrunch deep-dive. Use semantic HTML, clean structured headings, bullet points, and sophisticated language.
     
@@ -155,29 +472,160 @@ def writer_node(state: AgentState):
     {analyst_insight}
     """
     
-    print(f"   > Writer node invoking base LLM with {len(analyst_insight)} chars of insight...")
-    response = llm.invoke(prompt)
-    print(f"   > Writer response received.")
-    return {"messages": [response]}
+    # Every prompt below carries the full analysis, so fit it once against the largest template.
+    budget = NODE_TOKEN_BUDGETS["writer"]
+    template_tokens = max(
+        count_tokens(build_prompt("")),
+        count_tokens(SECTION_PROMPT.format(headline="x" * 80, outline="x" * 600, heading="x" * 120, analyst_insight="")),
+    )
+    kept, trimmed = fit_to_budget([(0, analyst_insight)], budget - template_tokens)
+    if trimmed:
+        print(f"   > Writer prompt over {budget} tokens; analysis truncated to fit.")
+    analyst_insight = kept[0] if kept else ""
+    emit = _stream_writer()
+    usage = []
+    
+    # Deadline: a lower token limit when short of time (split across the sections);
+    # when critical, no outline call and a single pass on the small model.
+    degradations = []
+    writer_config = config
+    num_predict = None
+    level = deadline.pressure(config, "Writer")
+    if level in (deadline.TIGHT, deadline.CRITICAL):
+        num_predict = deadline.DEGRADED_NUM_PREDICT["writer"]
+        degradations.append(degradation("Writer", "writer_tokens", config, num_predict=num_predict))
+    if level == deadline.CRITICAL:
+        smaller = smaller_model(config, "writer")
+        if smaller:
+            writer_config = smaller
+            degradations.append(degradation("Writer", "smaller_model", config, model=deadline.SMALL_MODEL))
+        if WRITER_PARALLELISM > 1:
+            degradations.append(degradation("Writer", "single_shot", config))
+    
+    def writer_llm(sections=1):
+        if num_predict is None:
+            return llm_for("writer", writer_config)
+        limit = max(num_predict // sections, deadline.MIN_SECTION_TOKENS)
+        return llm_for("writer", route_override(writer_config, "writer", num_predict=limit))
+    
+    # 1. Outline (short, not streamed)
+    headline, headings = "", []
+    if WRITER_PARALLELISM > 1 and level != deadline.CRITICAL:
+        outline_prompt = OUTLINE_PROMPT.format(max_sections=WRITER_MAX_SECTIONS, analyst_insight=analyst_insight)
+        try:
+            outline = llm_for("planner", config).invoke(outline_prompt)
+            usage.append(usage_record("writer", outline_prompt, outline, budget, trimmed))
+            headline, headings = _parse_outline(outline.content)
+        except Exception as e:
+            print(f"   > Writer outline failed ({e}); writing in one pass.")
+    
+    if len(headings) < 2:
+        # Nothing worth parallelising: single long completion, as before.
+        prompt = build_prompt(analyst_insight)
+        print(f"   > Writer node invoking base LLM with {len(analyst_insight)} chars of insight...")
+        response = generate_streaming("Writer", prompt, emit=emit, chat_model=writer_llm())
+        print(f"   > Writer response received.")
+        usage.append(usage_record("writer", prompt, response, budget, trimmed))
+        return {"messages": [_offloaded(response)], "token_usage": usage, "degradations": degradations}
+    
+    # 2. Fill: one completion per section, WRITER_PARALLELISM at a time
+    outline_text = "; ".join(f'"{h}"' for h in headings)
+    prompts = [
+        SECTION_PROMPT.format(headline=headline or "this issue", outline=outline_text, heading=h, analyst_insight=analyst_insight)
+        for h in headings
+    ]
+    print(f"   > Writer filling {len(headings)} sections, {min(WRITER_PARALLELISM, len(headings))} at a time...")
+    section_llm = writer_llm(len(headings))
+    with ThreadPoolExecutor(max_workers=min(WRITER_PARALLELISM, len(headings)), thread_name_prefix="writer") as executor:
+        responses = list(executor.map(
+            bind_context(lambda args: generate_streaming("Writer", args[1], section=args[0], emit=emit, chat_model=section_llm)),
+            enumerate(prompts),
+        ))
+    
+    # 3. Assemble in outline order
+    body = "\n\n".join(
+        f"<section>\n{strip_code_fences(r.content)}\n</section>" for r in responses
+    )
+    title = f"<h1>{escape(headline)}</h1>\n" if headline else ""
+    html = f"<article>\n{title}{body}\n</article>"
+    usage.extend(usage_record("writer", p, r, budget, trimmed) for p, r in zip(prompts, responses))
+    print(f"   > Writer response received ({len(headings)} sections).")
+    return {"messages": [_offloaded(AIMessage(content=html))], "token_usage": usage, "degradations": degradations}
+
+def revise_newsletter(draft: str, feedback: str, emit=None, config=None):
+    """
+    Applies reviewer feedback to an existing draft by rewriting only the
+    sections it affects (see revision.py). Returns (html, token_usage, stats).
+    Used by reviser_node and directly by the Streamlit review stage.
+    """
+    reviser_llm = llm_for("reviser", config)
+    generate = lambda prompt, index: generate_streaming("Reviser", prompt, section=index, emit=emit, chat_model=reviser_llm)
+    # Choosing which sections to touch is a short structured answer: the planner model handles it
+    with span("Revision", "step", trace_id=trace_id_from(config), feedback_chars=len(feedback)) as s:
+        html, calls, stats = revise_draft(llm_for("planner", config), draft, feedback, generate=generate)
+        s.set(**stats)
+    return html, [usage_record(role, prompt, response) for role, prompt, response in calls], stats
+
+@traced_node("Reviser")
+def reviser_node(state: AgentState, config=None):
+    """
+    Agent 4: Reviser (Human-in-the-Loop)
+    Responsibility: Patch the latest draft with the human's feedback (the last
+    message) instead of regenerating the whole newsletter.
+    """
+    print("\n--- [Agent: Reviser] is applying feedback ---")
+    feedback = state["messages"][-1].content
+    drafts = [message_text(m) for m in state["messages"][:-1] if isinstance(m, AIMessage) and m.content]
+    if not drafts:
+        return writer_node(state, config)
+    html, usage, stats = revise_newsletter(drafts[-1], feedback, emit=_stream_writer(), config=config)
+    print(f"   > Reviser updated {stats['parts_revised']} of {stats['parts_total']} sections.")
+    return {"messages": [_offloaded(AIMessage(content=html))], "token_usage": usage}
 
 # --- 3. Build the Graph ---
-# Use StateGraph to define the nodes and how they connect.
-workflow = StateGraph(AgentState)
+def build_workflow():
+    # Use StateGraph to define the nodes and how they connect.
+    workflow = StateGraph(AgentState)
+
+    # Add Nodes
+    workflow.add_node("Researcher", researcher_node)
+    workflow.add_node("Analyst", analyst_node)
+    workflow.add_node("Writer", writer_node)
 
-# Add Nodes
-workflow.add_node("Researcher", researcher_node)
-workflow.add_node("Analyst", analyst_node)
-workflow.add_node("Writer", writer_node)
+    # Add Edges (Define the linear flow)
+    # Start -> Researcher -> Analyst -> Writer -> End.
+    workflow.set_entry_point("Researcher")
+    workflow.add_edge("Researcher", "Analyst")
+    workflow.add_edge("Analyst", "Writer")
+    workflow.add_edge("Writer", END)
+    return workflow
+
+_app = None
+
+def get_app():
+    """
+    The compiled graph (`agents.app`), built once per process on first use.
+    Checkpoints are persisted per thread_id in SQLite (see checkpointer.py), so a run or a
+    review in progress survives an app restart without repeating research.
+    """
+    global _app
+    with _lazy_lock:
+        if _app is None:
+            _app = build_workflow().compile(checkpointer=get_checkpointer())
+        return _app
 
-# Add Edges (Define the linear flow)
-# Start -> Researcher -> Analyst -> Writer -> End.
-workflow.set_entry_point("Researcher")
-workflow.add_edge("Researcher", "Analyst")
-workflow.add_edge("Analyst", "Writer")
-workflow.add_edge("Writer", END)
+def __getattr__(name):
+    # PEP 562: module attributes that are built on first access.
+    if name == "app":
+        return get_app()
+    if name in ("llm", "llm_with_tools", "tools"):
+        _init_models()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Compile the graph
-app = workflow.compile()
+def record_revision(config, feedback: str, html: str):
+    """Appends a human revision to a checkpointed run so a resumed review shows the latest draft."""
+    get_app().update_state(config, {"messages": [HumanMessage(content=feedback), AIMessage(content=offload(html))]}, as_node="Writer")
 
 # --- 4. Runnable Test Block ---
 if __name__ == "__main__":
@@ -185,10 +633,11 @@ if __name__ == "__main__":
     print(f"Starting NewsNexus Agent Team on topic: '{user_topic}'...")
     
     inputs = {"messages": [HumanMessage(content=user_topic)], "research_data": []}
+    config = {"configurable": {"thread_id": f"agents_test_{int(time.time())}"}}
     
     # Run the graph and stream the output
-    for output in app.stream(inputs):
+    for output in get_app().stream(inputs, config):
         pass # The nodes will print their own status
     
     print("\n\n=== FINAL NEWSLETTER (HTML) ===")
-    print(output['Writer']['messages'][-1].content)
\ No newline at end of file
+    print(message_text(output['Writer']['messages'][-1]))
\ No newline at end of file
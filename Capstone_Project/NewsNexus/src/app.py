@@ -1,14 +1,20 @@
+import time
+import uuid
+
+SCRIPT_STARTED = time.perf_counter()  # first-paint timing, see the startup report below
+
 import streamlit as st
 import os
-import time
 from datetime import datetime
-from langchain_core.messages import HumanMessage
 
 # --- Import Backend ---
-from ingestion import ingest_documents
-from tools import get_llm_with_tools, lookup_policy_docs, web_search_stub
-from agents import app as agent_app
-from memory_store import MemoryStore
+# Only light modules here. agents, memory_store and ingestion pull in LangChain,
+# LangGraph, Chroma and the Ollama clients; they are loaded on demand through the
+# st.cache_resource loaders below, after the page has rendered.
+from ollama_models import CHAT_MODEL, MODEL_ROUTES, start_warm_up, health_check
+from tracing import get_trace, summarize, waterfall_figure
+from blob_store import resolve, message_text
+from deadline import RUN_DEADLINE_SECONDS, with_deadline, describe
 
 
 # ============================================================
@@ -25,6 +31,43 @@ os.makedirs(DATA_PATH, exist_ok=True)
 os.makedirs(DB_PATH, exist_ok=True)
 
 
+# ============================================================
+# SHARED RESOURCES (built once per server process)
+# ============================================================
+
+@st.cache_resource
+def startup_timings():
+    """Seconds spent building each shared resource, for the startup report."""
+    return {}
+
+@st.cache_resource(show_spinner="Loading the agent team …")
+def load_agents():
+    """agents.py with its graph compiled and main LLM built; shared by every rerun and session."""
+    started = time.perf_counter()
+    import agents
+    agents.get_app()
+    agents.main_llm()
+    startup_timings()["agents"] = round(time.perf_counter() - started, 2)
+    return agents
+
+@st.cache_resource(show_spinner="Opening the archive …")
+def load_memory_store():
+    started = time.perf_counter()
+    from memory_store import MemoryStore
+    store = MemoryStore()
+    startup_timings()["archive"] = round(time.perf_counter() - started, 2)
+    return store
+
+@st.cache_data(ttl=15, show_spinner=False)
+def cached_health_check():
+    # The sidebar reruns on every interaction; Ollama does not need asking that often.
+    return health_check()
+
+def ingest_documents():
+    from ingestion import ingest_documents as run_ingestion
+    return run_ingestion()
+
+
 # ============================================================
 # PAGE CONFIG
 # ============================================================
@@ -301,15 +344,47 @@ defaults = {
     "messages": [],
     "research_data": [],
     "chart_data": [],
-    "thread_id": f"session_{int(time.time())}",
+    "thread_id": f"session_{uuid.uuid4().hex}",
     "current_step": "idle",
     "draft_content": "",
+    "last_revision": None,
+    "resume_run": False,
+    "model_overrides": {},
+    "deadline_seconds": int(RUN_DEADLINE_SECONDS),
+    "degradations": [],
 }
 
 for key, value in defaults.items():
     if key not in st.session_state:
         st.session_state[key] = value
 
+# Preload the chat & embedding models once per server process, in the background,
+# so Ollama's cold-start is paid at boot instead of by the first research run.
+start_warm_up()
+
+# Resume after a restart: the run's thread_id is kept in the URL and its state in the
+# SQLite checkpointer, so a paused review (or an interrupted run) picks up where it
+# stopped instead of researching again.
+resume_thread = st.query_params.get("thread")
+if st.session_state.current_step == "idle" and resume_thread:
+    try:
+        saved = load_agents().app.get_state({"configurable": {"thread_id": resume_thread}})
+    except Exception as e:
+        print(f"   > [Checkpoints] Could not load session {resume_thread}: {e}")
+        saved = None
+    if saved is not None and saved.values.get("messages"):
+        st.session_state.thread_id = resume_thread
+        st.session_state.messages = saved.values["messages"][:1]
+        st.session_state.research_data = [resolve(item) for item in saved.values.get("research_data", [])]
+        st.session_state.chart_data = saved.values.get("chart_data", [])
+        st.session_state.degradations = saved.values.get("degradations", [])
+        if saved.next:
+            st.session_state.resume_run = True
+            st.session_state.current_step = "researching"
+        else:
+            st.session_state.draft_content = message_text(saved.values["messages"][-1])
+            st.session_state.current_step = "reviewing"
+
 
 # ============================================================
 # UTILITIES
@@ -540,10 +615,29 @@ with st.sidebar:
         unsafe_allow_html=True,
     )
     st.markdown(
-        "<span style='font-size:0.8rem;opacity:0.7;'>LLM: Llama 3.2 via Ollama</span>",
+        f"<span style='font-size:0.8rem;opacity:0.7;'>LLM: {CHAT_MODEL} via Ollama</span>",
         unsafe_allow_html=True,
     )
 
+    # --- Model residency (filled in after the main page has rendered) ---
+    residency_slot = st.empty()
+
+    # --- Model routing (per run) ---
+    with st.expander("⚙️ Model Routing", expanded=False):
+        st.caption("Model per stage for the next run. Smaller models answer faster.")
+        overrides = {}
+        for node, route in MODEL_ROUTES.items():
+            chosen = st.text_input(node.capitalize(), value=route["model"], key=f"route_{node}")
+            if chosen.strip() and chosen.strip() != route["model"]:
+                overrides[node] = {"model": chosen.strip()}
+        st.session_state.model_overrides = overrides
+
+    # --- Deadline (per run) ---
+    with st.expander("⏱️ Deadline", expanded=False):
+        st.caption("Time budget for the next run. When time runs short, stages search less, "
+                   "write shorter or switch to the small model instead of running over.")
+        st.number_input("Draft within (seconds, 0 = no limit)", min_value=0, step=30, key="deadline_seconds")
+
     st.markdown('<hr class="divider-gradient">', unsafe_allow_html=True)
 
     # --- Knowledge base ---
@@ -584,6 +678,7 @@ with st.sidebar:
 
     st.markdown('<hr class="divider-gradient">', unsafe_allow_html=True)
     st.caption(f"Session: `{st.session_state.thread_id[:18]}…`")
+    startup_slot = st.empty()
 
 
 # ============================================================
@@ -645,6 +740,45 @@ topic = st.text_input(
     label_visibility="collapsed",
 )
 
+# ============================================================
+# STARTUP REPORT & DEFERRED SIDEBAR
+# ============================================================
+
+# Everything above is the first paint: no LangChain, LangGraph or Chroma import and no
+# Ollama round-trip. The first run of each session reports how long that took.
+first_paint = time.perf_counter() - SCRIPT_STARTED
+if "first_paint_ms" not in st.session_state:
+    st.session_state.first_paint_ms = round(first_paint * 1000)
+    print(f"[Startup] First paint after {first_paint * 1000:.0f} ms.")
+
+with residency_slot.container():
+    health = cached_health_check()
+    if health["ollama"] == "down":
+        st.markdown(
+            "<span style='font-size:0.8rem;color:#EF4444;'>Ollama unreachable</span>",
+            unsafe_allow_html=True,
+        )
+    else:
+        for model, info in health["models"].items():
+            warm = info["warm_up"] or {}
+            if info["resident"]:
+                state_txt = "● in memory"
+            elif not warm:
+                state_txt = "○ warming up …"
+            else:
+                state_txt = "○ not loaded"
+            load_txt = f" · loaded in {warm['load_seconds']}s" if warm.get("load_seconds") else ""
+            st.markdown(
+                f"<span style='font-size:0.8rem;opacity:0.7;'>{model}: {state_txt}{load_txt}</span>",
+                unsafe_allow_html=True,
+            )
+
+built = startup_timings()
+startup_slot.caption(
+    f"⚡ First paint {st.session_state.first_paint_ms} ms"
+    + "".join(f" · {name} loaded in {seconds}s" for name, seconds in built.items())
+)
+
 # ============================================================
 # START AGENTS
 # ============================================================
@@ -672,11 +806,17 @@ if (
         st.warning("🌐 No PDFs found. Web search mode only.")
 
     st.session_state.current_step = "researching"
+    st.session_state.last_revision = None
+    # Every run gets its own checkpoint thread; the URL keeps it for resuming
+    st.session_state.thread_id = f"session_{uuid.uuid4().hex}"
+    st.query_params["thread"] = st.session_state.thread_id
+    from langchain_core.messages import HumanMessage
     st.session_state.messages = [HumanMessage(content=topic)]
     st.session_state.research_data = []
+    st.session_state.degradations = []
 
     try:
-        mem_store = MemoryStore()
+        mem_store = load_memory_store()
         with st.spinner("Checking historical archives …"):
             past_memory = mem_store.check_memory(topic)
         if "WARNING" in past_memory:
@@ -703,24 +843,71 @@ if st.session_state.current_step == "researching":
     with col3:
         writer_status = st.status("✍️ Writer Agent", state="running", expanded=False)
 
-    config = {"configurable": {"thread_id": st.session_state.thread_id}}
+    # The deadline is anchored here, once per run; every node measures against it.
+    config = with_deadline({
+        "configurable": {
+            "thread_id": st.session_state.thread_id,
+            "models": st.session_state.model_overrides,
+        }
+    }, st.session_state.deadline_seconds)
     inputs = {
         "messages": st.session_state.messages,
         "research_data": [],
         "chart_data": [],
     }
+    if st.session_state.resume_run:
+        # Continue the checkpointed run from its last completed node
+        inputs = None
+        st.session_state.resume_run = False
+        if st.session_state.research_data:
+            research_status.update(
+                label=f"Researcher — {len(st.session_state.research_data)} items (restored)",
+                state="complete",
+                expanded=False,
+            )
+
+    # Live previews fed by token deltas streamed from the Analyst and Writer nodes
+    with analyst_status:
+        analyst_preview = st.empty()
+    with writer_status:
+        writer_preview = st.empty()
+    live_text = {"Analyst": "", "Writer": ""}
+    writer_sections = {}  # section index -> text; the Writer fills sections concurrently
+    last_paint = 0.0
 
     try:
-        for event in agent_app.stream(inputs, config):
+        for mode, event in load_agents().app.stream(inputs, config, stream_mode=["updates", "custom"]):
+
+            if mode == "custom":
+                node = event.get("node")
+                if node in live_text:
+                    if "section" in event:
+                        writer_sections[event["section"]] = writer_sections.get(event["section"], "") + event["delta"]
+                        live_text[node] = "\n".join(writer_sections[i] for i in sorted(writer_sections))
+                    else:
+                        live_text[node] += event.get("delta", "")
+                    # Repaint at most ~4x per second to keep the websocket light
+                    if time.time() - last_paint > 0.25:
+                        if node == "Analyst":
+                            analyst_preview.markdown(live_text[node])
+                        else:
+                            writer_preview.markdown(live_text[node], unsafe_allow_html=True)
+                        last_paint = time.time()
+                continue
+
+            for data in event.values():
+                st.session_state.degradations += (data or {}).get("degradations", [])
 
             if "Researcher" in event:
                 data = event["Researcher"]
-                st.session_state.research_data = data.get("research_data", [])
+                st.session_state.research_data = [resolve(item) for item in data.get("research_data", [])]
                 with research_status:
                     for item in st.session_state.research_data:
                         st.markdown(f"---\n{item}")
+                stats = data.get("research_stats", {})
                 research_status.update(
-                    label=f"Researcher — {len(st.session_state.research_data)} items found",
+                    label=f"Researcher — {len(st.session_state.research_data)} items found"
+                    + (f" · {stats['calls_saved']} calls saved" if stats.get("calls_saved") else ""),
                     state="complete",
                     expanded=False,
                 )
@@ -729,6 +916,7 @@ if st.session_state.current_step == "researching":
             if "Analyst" in event:
                 data = event["Analyst"]
                 st.session_state.chart_data = data.get("chart_data", [])
+                analyst_preview.empty()
                 with analyst_status:
                     st.write("Identified trends & extracted data:")
                     if st.session_state.chart_data:
@@ -742,7 +930,8 @@ if st.session_state.current_step == "researching":
 
             if "Writer" in event:
                 data = event["Writer"]
-                st.session_state.draft_content = data["messages"][-1].content
+                st.session_state.draft_content = message_text(data["messages"][-1])
+                writer_preview.empty()
                 with writer_status:
                     st.success("Draft generated!")
                     st.code(st.session_state.draft_content[:200] + "…", language="html")
@@ -792,8 +981,20 @@ if st.session_state.current_step == "reviewing":
         )
         st.plotly_chart(fig, use_container_width=True)
 
+    if st.session_state.last_revision:
+        rev = st.session_state.last_revision
+        st.caption(
+            f"Last revision (\"{rev['feedback']}\") rewrote {rev['parts_revised']} of "
+            f"{rev['parts_total']} sections."
+        )
+
+    if st.session_state.degradations:
+        with st.expander(f"⏱️ Deadline — {len(st.session_state.degradations)} degradations applied", expanded=False):
+            for record in st.session_state.degradations:
+                st.markdown(f"- {describe(record)}")
+
     # Tabbed views
-    tab1, tab2 = st.tabs(["📄 Newsletter Draft", "🔍 Raw Research Log"])
+    tab1, tab2, tab3 = st.tabs(["📄 Newsletter Draft", "🔍 Raw Research Log", "⏱️ Run Trace"])
 
     with tab1:
         st.components.v1.html(
@@ -813,6 +1014,24 @@ if st.session_state.current_step == "reviewing":
                 "No raw research data. Agents may have relied on internal knowledge."
             )
 
+    with tab3:
+        # Every node, tool, embedding and LLM call of this session (run + revisions), from tracing.py
+        spans = get_trace(st.session_state.thread_id)
+        if spans:
+            summary = summarize(spans)
+            kinds = summary["kinds"]
+            st.caption(
+                f"{len(spans)} spans over {summary['wall_ms'] / 1000:.1f}s · "
+                f"{summary['llm_calls']} LLM calls ({summary['llm_cache_hits']} cache hits, "
+                f"{summary['prompt_tokens']:,} prompt / {summary['completion_tokens']:,} completion tokens) · "
+                f"{kinds.get('tool', {}).get('count', 0)} tool calls · "
+                f"{kinds.get('embedding', {}).get('count', 0)} embedding calls"
+                + (f" · {summary['errors']} errors" if summary["errors"] else "")
+            )
+            st.plotly_chart(waterfall_figure(spans), use_container_width=True)
+        else:
+            st.info("No trace recorded for this session (tracing off, or the run predates it).")
+
     st.markdown('<hr class="divider-gradient">', unsafe_allow_html=True)
 
     # Feedback area
@@ -827,23 +1046,33 @@ if st.session_state.current_step == "reviewing":
         submit = st.button("✅  Submit", use_container_width=True)
 
     if submit:
-        config = {"configurable": {"thread_id": st.session_state.thread_id}}
-
         if feedback:
-            agent_app.update_state(
-                config, {"messages": [HumanMessage(content=feedback)]}
-            )
-            for _ in agent_app.stream(None, config):
-                pass
-            state = agent_app.get_state(config)
-            st.session_state.draft_content = state.values["messages"][-1].content
-            st.session_state.chart_data = state.values.get("chart_data", [])
+            agents = load_agents()
+            # Patch only the sections the feedback touches instead of re-running the Writer
+            with st.spinner("Revising the affected sections …"):
+                revised, _, stats = agents.revise_newsletter(
+                    st.session_state.draft_content,
+                    feedback,
+                    config={"configurable": {"thread_id": st.session_state.thread_id,
+                                             "models": st.session_state.model_overrides}},
+                )
+            try:
+                agents.record_revision(
+                    {"configurable": {"thread_id": st.session_state.thread_id}}, feedback, revised
+                )
+            except Exception as e:
+                print(f"   > [Checkpoints] Revision not saved to session: {e}")
+            from langchain_core.messages import HumanMessage
+            st.session_state.messages.append(HumanMessage(content=feedback))
+            st.session_state.draft_content = revised
+            st.session_state.last_revision = {"feedback": feedback, **stats}
             st.rerun()
         else:
             st.session_state.current_step = "finished"
-            mem_store = MemoryStore()
+            mem_store = load_memory_store()
             topic_key = st.session_state.messages[0].content
             mem_store.save_memory(topic_key, st.session_state.draft_content)
+            st.query_params.pop("thread", None)
             st.rerun()
 
 
@@ -905,6 +1134,7 @@ if st.session_state.current_step == "finished":
         )
         if st.button("🔄  Start Over", use_container_width=True):
             st.session_state.current_step = "idle"
+            st.query_params.pop("thread", None)
             st.rerun()
 
     st.markdown('<hr class="divider-gradient">', unsafe_allow_html=True)
@@ -0,0 +1,184 @@
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from langchain_core.messages import HumanMessage
+from blob_store import message_text
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.join(BASE_DIR, "..")
+BATCH_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "data", "batch")
+# Topics run at once. Every topic in the process shares the search, RSS and LLM
+# caches, so overlapping topics get cheaper as the batch goes on.
+BATCH_WORKERS = int(os.getenv("NEWSNEXUS_BATCH_WORKERS", 2))
+
+def read_topics(path):
+    """One topic per line; blank lines and lines starting with # are skipped. Duplicates run once."""
+    topics = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            topic = line.strip()
+            if topic and not topic.startswith("#") and topic not in topics:
+                topics.append(topic)
+    return topics
+
+def topic_slug(topic: str) -> str:
+    digest = hashlib.sha1(topic.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-')[:50]}-{digest}"
+
+class BatchManifest:
+    """
+    Progress file (manifest.json) in the output directory: one entry per topic
+    with its status ("done" | "failed"), output files and timings. Rewritten
+    atomically after every topic so a crashed batch resumes where it stopped.
+    """
+
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, "manifest.json")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("topics", {})
+
+    def is_done(self, topic, out_dir):
+        entry = self.entries.get(topic)
+        return bool(entry and entry["status"] == "done"
+                    and os.path.exists(os.path.join(out_dir, entry["html"])))
+
+    def record(self, topic, entry):
+        with self._lock:
+            self.entries[topic] = entry
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": str(datetime.now()), "topics": self.entries}, f, indent=2)
+            os.replace(tmp, self.path)
+
+def run_topic(topic, out_dir, resume=True, archive=False):
+    """
+    Runs one topic through the checkpointed graph and writes <slug>.html and
+    <slug>.json (timings, token usage, research stats). The thread_id is
+    derived from the output directory and topic, so a topic interrupted
+    mid-pipeline continues from its last completed node on the next run.
+    """
+    from agents import app as agent_app
+    from checkpointer import clear_thread
+
+    slug = topic_slug(topic)
+    thread_id = f"batch_{hashlib.sha1(f'{os.path.abspath(out_dir)}|{topic}'.encode('utf-8')).hexdigest()[:16]}"
+    config = {"configurable": {"thread_id": thread_id}}
+    started = time.time()
+    node_seconds = {}
+
+    if not resume:
+        clear_thread(thread_id)
+    saved = agent_app.get_state(config)
+    if saved.values.get("messages") and not saved.next:
+        print(f"[Batch] '{topic}': finished before the crash, collecting its draft.")
+    else:
+        inputs = None if saved.next else {
+            "messages": [HumanMessage(content=topic)], "research_data": [], "chart_data": [],
+        }
+        if saved.next:
+            print(f"[Batch] '{topic}': resuming at {', '.join(saved.next)}.")
+        last = time.time()
+        # The graph is linear, so the gap between consecutive updates is the node's run time.
+        for event in agent_app.stream(inputs, config, stream_mode="updates"):
+            now = time.time()
+            for node in event:
+                node_seconds[node] = round(node_seconds.get(node, 0) + now - last, 2)
+            last = now
+
+    values = agent_app.get_state(config).values
+    draft = message_text(values["messages"][-1])
+    usage = values.get("token_usage", [])
+
+    with open(os.path.join(out_dir, f"{slug}.html"), "w", encoding="utf-8") as f:
+        f.write(draft)
+    report = {
+        "topic": topic,
+        "thread_id": thread_id,
+        "seconds": round(time.time() - started, 2),
+        "node_seconds": node_seconds,
+        "prompt_tokens": sum(u.get("prompt_tokens", 0) for u in usage),
+        "completion_tokens": sum(u.get("completion_tokens", 0) for u in usage),
+        "cached_calls": sum(1 for u in usage if u.get("cached")),
+        "research_stats": values.get("research_stats", {}),
+        "chart_data": values.get("chart_data", []),
+        "finished_at": str(datetime.now()),
+    }
+    with open(os.path.join(out_dir, f"{slug}.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    if archive:
+        from memory_store import MemoryStore
+        MemoryStore().save_memory(topic, draft)
+    return slug, report
+
+def run_batch(topics, out_dir, workers=BATCH_WORKERS, resume=True, archive=False):
+    """Runs every topic not yet done, `workers` at a time. Returns the summary written to summary.json."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = BatchManifest(out_dir)
+    pending = [t for t in topics if not (resume and manifest.is_done(t, out_dir))]
+    print(f"[Batch] {len(topics)} topics, {len(topics) - len(pending)} already done, "
+          f"running {len(pending)} with {workers} workers -> {out_dir}")
+
+    import agents
+    agents.get_app()  # build the graph once, before the workers start
+    # Load every routed model once up front instead of letting the first topics race for it.
+    try:
+        from ollama_models import warm_up
+        warm_up()
+    except Exception as e:
+        print(f"[Batch] Warm-up skipped: {e}")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as executor:
+        futures = {executor.submit(run_topic, t, out_dir, resume, archive): t for t in pending}
+        for future in as_completed(futures):
+            topic = futures[future]
+            try:
+                slug, report = future.result()
+                manifest.record(topic, {"status": "done", "html": f"{slug}.html", "json": f"{slug}.json",
+                                        "seconds": report["seconds"], "node_seconds": report["node_seconds"]})
+                print(f"[Batch] Done '{topic}' in {report['seconds']}s.")
+            except Exception as e:
+                manifest.record(topic, {"status": "failed", "html": None, "json": None, "error": str(e)})
+                print(f"[Batch] FAILED '{topic}': {e}")
+
+    entries = [manifest.entries[t] for t in topics if t in manifest.entries]
+    done = [e for e in entries if e["status"] == "done"]
+    summary = {
+        "topics": len(topics),
+        "done": len(done),
+        "failed": sum(1 for e in entries if e["status"] == "failed"),
+        "wall_seconds": round(time.time() - started, 2),
+        "topic_seconds_total": round(sum(e["seconds"] for e in done), 2),
+        "workers": workers,
+        "finished_at": str(datetime.now()),
+    }
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+# Test block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the NewsNexus pipeline headlessly for a list of topics.")
+    parser.add_argument("topics", help="Text file with one topic per line")
+    parser.add_argument("--out", default=os.path.join(BATCH_OUTPUT_DIR, datetime.now().strftime("%Y-%m-%d")),
+                        help="Output directory (default: data/batch/<today>)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Topics to run at once")
+    parser.add_argument("--no-resume", action="store_true", help="Re-run every topic from scratch")
+    parser.add_argument("--archive", action="store_true", help="Save each newsletter to the long-term archive")
+    args = parser.parse_args()
+
+    summary = run_batch(read_topics(args.topics), args.out, workers=args.workers,
+                        resume=not args.no_resume, archive=args.archive)
+    print(json.dumps(summary, indent=2))
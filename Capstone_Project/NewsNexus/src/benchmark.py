@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import tempfile
+import subprocess
+import threading
+import tracemalloc
+from statistics import mean, median
+
+# --- Configuration ---
+# Defaults inject no latency, so the numbers are pure framework cost: state merging,
+# checkpointing, prompt building, dedup/compression and chart extraction.
+DEFAULT_TOPICS = 5
+DEFAULT_PAYLOAD_ITEMS = 8      # findings per fake tool call
+DEFAULT_PAYLOAD_CHARS = 600    # characters per finding snippet
+DEFAULT_COMPLETION_CHARS = 3000
+STREAM_CHUNK_CHARS = 16        # fake streaming granularity (roughly 4 tokens)
+
+# Startup report: what app.py imports before its first paint, and what it defers to
+# st.cache_resource loaders. Each is timed in a fresh interpreter (a real cold start).
+FIRST_PAINT_IMPORTS = ("streamlit", "ollama_models", "tracing")
+DEFERRED_IMPORTS = ("langchain_core.messages", "memory_store", "ingestion", "agents")
+FIRST_PAINT_TARGET_SECONDS = 1.0
+
+WORDS = ("market", "model", "chip", "growth", "revenue", "policy", "cloud", "agent", "inference",
+         "bank", "risk", "adoption", "latency", "compute", "regulation", "startup", "data", "energy")
+
+def _text(seed: str, chars: int) -> str:
+    """Deterministic pseudo-prose of about `chars` characters."""
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:chars]
+
+class FakeChatModel:
+    """
+    Deterministic stand-in for ChatOllama. It recognises each agent prompt and
+    answers in the shape that agent expects: planner queries, outline,
+    section HTML, revision picks, condensed facts, or analysis with a chart
+    JSON block. `latency` is slept once per call.
+    """
+
+    model = "fake"
+    temperature = 0
+
+    def __init__(self, latency=0.0, completion_chars=DEFAULT_COMPLETION_CHARS):
+        self.latency = latency
+        self.completion_chars = completion_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        seed = str(len(prompt))
+        if "Research Director" in prompt:
+            return " | ".join(f"{_text(seed + str(i), 40)}" for i in range(3))
+        if "HEADLINE:" in prompt:
+            return "HEADLINE: Benchmark Weekly\n" + "\n".join(f"{i}. Section {i}" for i in range(1, 5))
+        if prompt.startswith("You are the editor"):
+            return "1"
+        if "condensing raw search results" in prompt:
+            return "\n".join(f"- {_text(seed + str(i), 120)} [{i}]" for i in range(1, 6))
+        if "Write ONLY the section" in prompt:
+            heading = prompt.split('Write ONLY the section "', 1)[1].split('"', 1)[0]
+            body = _text(seed, self.completion_chars // 4)
+            return f"<h2>{heading}</h2>\n<p>{body}</p>"
+        if "senior expert analyst" in prompt:
+            chart = json.dumps([{"label": str(2020 + i), "value": 10 * i} for i in range(5)])
+            return f"{_text(seed, self.completion_chars)}\n```json\n{chart}\n```"
+        return f"<p>{_text(seed, self.completion_chars)}</p>"
+
+    def invoke(self, prompt, config=None, **kwargs):
+        from langchain_core.messages import AIMessage
+        return AIMessage(content=self._respond(prompt))
+
+    def stream(self, prompt, config=None, **kwargs):
+        from langchain_core.messages import AIMessageChunk
+        content = self._respond(prompt)
+        for i in range(0, len(content), STREAM_CHUNK_CHARS):
+            yield AIMessageChunk(content=content[i:i + STREAM_CHUNK_CHARS])
+
+class FakeTools:
+    """Deterministic web / RSS / internal-document records with configurable latency and size."""
+
+    def __init__(self, latency=0.0, items=DEFAULT_PAYLOAD_ITEMS, chars=DEFAULT_PAYLOAD_CHARS):
+        self.latency = latency
+        self.items = items
+        self.chars = chars
+
+    def _records(self, source, query):
+        from findings import make_finding
+
+        if self.latency:
+            time.sleep(self.latency)
+        return [
+            make_finding(f"https://{source}.example.com/{zlib.crc32(query.encode('utf-8'))}/{i}",
+                         f"{source} result {i} for {query[:40]}",
+                         _text(f"{source}|{query}|{i}", self.chars), source, query, publisher=source)
+            for i in range(self.items)
+        ]
+
+    def web(self, query):
+        return self._records("web", query)
+
+    def rss(self, query):
+        return self._records("rss", query)
+
+    def rag(self, query):
+        return self._records("rag", query)[:3]
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def run_benchmark(topics=DEFAULT_TOPICS, tool_latency=0.0, llm_latency=0.0, payload_items=DEFAULT_PAYLOAD_ITEMS,
+                  payload_chars=DEFAULT_PAYLOAD_CHARS, completion_chars=DEFAULT_COMPLETION_CHARS, deadline_seconds=0):
+    """
+    Runs `topics` topics through the agents.py graph with fake model and
+    tools, checkpointing to a throwaway SQLite file. Returns per-node
+    latency stats, total wall time, peak memory and checkpoint size.
+    With `deadline_seconds`, each topic runs against that deadline and the
+    degradations it triggered are counted.
+    """
+    workdir = tempfile.mkdtemp(prefix="newsnexus_bench_")
+    # Must be set before checkpointer/agents/tracing are imported.
+    os.environ["NEWSNEXUS_CHECKPOINT_DB"] = os.path.join(workdir, "checkpoints.sqlite")
+    os.environ["NEWSNEXUS_LLM_CACHE"] = "0"
+    os.environ["NEWSNEXUS_TRACE_DIR"] = os.path.join(workdir, "traces")
+
+    from langchain_core.messages import HumanMessage
+    import agents
+    import blob_store
+    import checkpointer
+    from deadline import with_deadline
+
+    fake_llm = FakeChatModel(latency=llm_latency, completion_chars=completion_chars)
+    fake_tools = FakeTools(latency=tool_latency, items=payload_items, chars=payload_chars)
+    agents.llm = fake_llm
+    agents.llm_for = lambda node, config=None: fake_llm
+    agents.web_search_records = fake_tools.web
+    agents.rss_records = fake_tools.rss
+    agents.policy_doc_records = fake_tools.rag
+
+    node_times = {}
+    topic_times = []
+    degradations = {}
+    tracemalloc.start()
+    started = time.perf_counter()
+    for n in range(topics):
+        topic = f"benchmark topic {n}: {_text(str(n), 40)}"
+        config = with_deadline({"configurable": {"thread_id": f"bench_{n}"}}, deadline_seconds)
+        inputs = {"messages": [HumanMessage(content=topic)], "research_data": [], "chart_data": []}
+        topic_start = last = time.perf_counter()
+        # The graph is linear, so the gap between consecutive updates is the node's run time.
+        for event in agents.app.stream(inputs, config, stream_mode="updates"):
+            now = time.perf_counter()
+            for node in event:
+                node_times.setdefault(node, []).append(now - last)
+            last = now
+        topic_times.append(time.perf_counter() - topic_start)
+        for record in agents.app.get_state(config).values.get("degradations", []):
+            key = f"{record['node']}.{record['action']}"
+            degradations[key] = degradations.get(key, 0) + 1
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # What one checkpoint of a finished run costs to serialize (large text is held as blob refs).
+    values = agents.app.get_state(config).values
+    serialize_start = time.perf_counter()
+    _, state_bytes = checkpointer.CompressedSerializer().dumps_typed(values)
+    serialize_ms = (time.perf_counter() - serialize_start) * 1000
+
+    try:
+        import resource
+        max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    except ImportError:
+        max_rss_mb = None
+
+    return {
+        "params": {"topics": topics, "tool_latency": tool_latency, "llm_latency": llm_latency,
+                   "payload_items": payload_items, "payload_chars": payload_chars,
+                   "completion_chars": completion_chars, "deadline_seconds": deadline_seconds},
+        "wall_seconds": round(wall, 3),
+        "topic_seconds": {"mean": round(mean(topic_times), 4), "max": round(max(topic_times), 4)},
+        "nodes": {
+            node: {"mean_ms": round(mean(t) * 1000, 2), "p50_ms": round(median(t) * 1000, 2),
+                   "p95_ms": round(_percentile(t, 95) * 1000, 2), "runs": len(t)}
+            for node, t in node_times.items()
+        },
+        "llm_calls": fake_llm.calls,
+        "degradations": degradations,
+        "peak_python_mb": round(peak / 2**20, 2),
+        "max_rss_mb": round(max_rss_mb, 1) if max_rss_mb else None,
+        "checkpoints": checkpointer.stats(),
+        "final_state": {"serialized_kb": round(len(state_bytes) / 1024, 1), "serialize_ms": round(serialize_ms, 2)},
+        "blobs": blob_store.stats(),
+        "python": sys.version.split()[0],
+    }
+
+def _cold_seconds(code, env):
+    """Runs `code` in a fresh interpreter from src/; it must print elapsed seconds last. None on failure."""
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, timeout=600)
+    if result.returncode != 0:
+        print(f"   > [Startup] Failed: {result.stderr.strip().splitlines()[-1:]}")
+        return None
+    return round(float(result.stdout.strip().splitlines()[-1]), 3)
+
+def startup_report():
+    """
+    Cold-start cost of the Streamlit app: the imports needed for first paint
+    (together), each deferred module on its own, and compiling the graph.
+    """
+    env = dict(os.environ, NEWSNEXUS_CHECKPOINT_DB=os.path.join(tempfile.mkdtemp(prefix="newsnexus_startup_"), "cp.sqlite"))
+    timer = "import time; t = time.perf_counter(); {}; print(time.perf_counter() - t)"
+    first_paint = _cold_seconds(timer.format("; ".join(f"import {m}" for m in FIRST_PAINT_IMPORTS)), env)
+    return {
+        "first_paint_imports_s": first_paint,
+        "first_paint_ok": first_paint is not None and first_paint < FIRST_PAINT_TARGET_SECONDS,
+        "deferred_imports_s": {m: _cold_seconds(timer.format(f"import {m}"), env) for m in DEFERRED_IMPORTS},
+        "graph_build_s": _cold_seconds(timer.format("import agents; agents.get_app(); agents.main_llm()"), env),
+        "python": sys.version.split()[0],
+    }
+
+# Test block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the agent graph with a fake model and fake tools.")
+    parser.add_argument("--topics", type=int, default=DEFAULT_TOPICS)
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds per fake tool call")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per fake model call")
+    parser.add_argument("--payload-items", type=int, default=DEFAULT_PAYLOAD_ITEMS, help="Findings per tool call")
+    parser.add_argument("--payload-chars", type=int, default=DEFAULT_PAYLOAD_CHARS, help="Characters per finding")
+    parser.add_argument("--completion-chars", type=int, default=DEFAULT_COMPLETION_CHARS)
+    parser.add_argument("--deadline", type=float, default=0, help="Per-topic run deadline in seconds (0 = none)")
+    parser.add_argument("--startup", action="store_true", help="Report the app's cold-start import times instead")
+    parser.add_argument("--out", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.startup:
+        report = startup_report()
+    else:
+        report = run_benchmark(args.topics, args.tool_latency, args.llm_latency, args.payload_items,
+                               args.payload_chars, args.completion_chars, args.deadline)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,139 @@
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import functools
+
+from checkpointer import CHECKPOINT_DB
+
+# --- Configuration ---
+# Blobs are only referenced from checkpoints, so they live next to the checkpoint
+# database they belong to (and are swept against it, see checkpointer.collect_blobs).
+BLOB_DIR = os.getenv("NEWSNEXUS_BLOB_DIR", os.path.join(os.path.dirname(CHECKPOINT_DB), "blobs"))
+# Text at least this long leaves AgentState for the blob store; the state keeps a short
+# reference. 0 keeps everything inline.
+BLOB_MIN_CHARS = int(os.getenv("NEWSNEXUS_BLOB_MIN_CHARS", 2048))
+BLOB_CACHE_ENTRIES = 256  # resolved blobs kept in memory per process
+# Unreferenced blobs younger than this survive a sweep: a running node may have
+# stored one whose checkpoint has not been written yet.
+SWEEP_GRACE_SECONDS = 3600
+
+# Reference format: blob:<sha256 of the UTF-8 text>:<length in characters>
+_REF_RE = re.compile(r"^blob:([0-9a-f]{64}):(\d+)$")
+REF_DIGEST_RE = re.compile(rb"blob:([0-9a-f]{64}):\d+")  # for scanning serialized checkpoints
+
+class BlobMissing(LookupError):
+    """Raised when a reference points at a blob that is no longer on disk."""
+
+def _path(digest: str) -> str:
+    return os.path.join(BLOB_DIR, digest[:2], digest[2:])
+
+def put(text: str) -> str:
+    """Stores `text` once (zlib-compressed, keyed by its SHA-256) and returns its reference."""
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _path(digest)
+    if os.path.exists(path):
+        os.utime(path)  # still in use; see sweep()
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp, path)  # same content, so concurrent writers are harmless
+    return f"blob:{digest}:{len(text)}"
+
+@functools.lru_cache(maxsize=BLOB_CACHE_ENTRIES)
+def _load(digest: str) -> str:
+    try:
+        with open(_path(digest), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+    except FileNotFoundError:
+        raise BlobMissing(f"Blob {digest[:12]}… not found in {BLOB_DIR}") from None
+
+def is_ref(value) -> bool:
+    return isinstance(value, str) and _REF_RE.match(value) is not None
+
+def get(ref: str) -> str:
+    match = _REF_RE.match(ref)
+    if not match:
+        raise ValueError(f"Not a blob reference: {ref[:80]!r}")
+    return _load(match.group(1))
+
+def resolve(value):
+    """The text behind a reference; anything else is returned unchanged."""
+    return get(value) if is_ref(value) else value
+
+def offload(text):
+    """A reference for long text, the text itself otherwise."""
+    if BLOB_MIN_CHARS > 0 and isinstance(text, str) and len(text) >= BLOB_MIN_CHARS and not is_ref(text):
+        return put(text)
+    return text
+
+def offload_json(value):
+    """Like offload() for JSON-serializable values (e.g. the findings list)."""
+    if BLOB_MIN_CHARS <= 0:
+        return value
+    text = json.dumps(value, ensure_ascii=False)
+    return put(text) if len(text) >= BLOB_MIN_CHARS else value
+
+def resolve_json(value):
+    return json.loads(get(value)) if is_ref(value) else value
+
+def text_length(value) -> int:
+    """Length of the text a value stands for, without loading the blob."""
+    match = _REF_RE.match(value) if isinstance(value, str) else None
+    return int(match.group(2)) if match else len(value or "")
+
+def message_text(message) -> str:
+    """A message's content with any blob reference resolved."""
+    return resolve(message.content)
+
+def sweep(live_digests, grace_seconds=SWEEP_GRACE_SECONDS):
+    """
+    Deletes blobs whose digest is not in `live_digests` (the references still held
+    by checkpoints, see checkpointer.live_blob_digests) and that were not written
+    in the last `grace_seconds`. Returns the number of blobs removed.
+    """
+    if not os.path.isdir(BLOB_DIR):
+        return 0
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for prefix in os.listdir(BLOB_DIR):
+        folder = os.path.join(BLOB_DIR, prefix)
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if prefix + name in live_digests or name.endswith(".tmp"):
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+    if removed:
+        _load.cache_clear()
+        print(f"   > [Blobs] Swept {removed} unreferenced blobs.")
+    return removed
+
+def stats():
+    """Blob count and on-disk size, for the benchmark and the CLI."""
+    count = size = 0
+    if os.path.isdir(BLOB_DIR):
+        for root, _, files in os.walk(BLOB_DIR):
+            for name in files:
+                count += 1
+                size += os.path.getsize(os.path.join(root, name))
+    return {"blobs": count, "size_kb": round(size / 1024, 1)}
+
+# Test block
+if __name__ == "__main__":
+    draft = "<article>" + "<p>Long newsletter paragraph.</p>" * 200 + "</article>"
+    ref = offload(draft)
+    print(ref, "->", text_length(ref), "chars")
+    print("round trip ok:", resolve(ref) == draft, "| short text kept inline:", offload("short") == "short")
+    print(stats())
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # src/
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+CACHE_DIR = os.path.join(PROJECT_ROOT, "data", "cache")
+
+class DiskCache:
+    """
+    A small persistent key/value cache backed by SQLite.
+    Values are stored as JSON together with the time they were written, so
+    callers decide for themselves what counts as fresh or stale.
+    Safe to share between threads (every call opens its own connection).
+    """
+
+    def __init__(self, path: str, max_entries: int = None):
+        self.path = path
+        self.max_entries = max_entries
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                       key TEXT PRIMARY KEY,
+                       value TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       accessed_at REAL NOT NULL
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str):
+        """Returns (value, age_in_seconds) or None on a miss."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if self.max_entries:
+                # Only bounded caches need LRU bookkeeping.
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        value, created_at = row
+        return json.loads(value), now - created_at
+
+    def set(self, key: str, value):
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if self.max_entries:
+                conn.execute(
+                    """DELETE FROM entries WHERE key IN (
+                           SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                       )""",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str):
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def purge_older_than(self, max_age_seconds: float) -> int:
+        """Drops entries written more than `max_age_seconds` ago. Returns how many were removed."""
+        with self._write_lock, self._connect() as conn:
+            cur = conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - max_age_seconds,))
+            return cur.rowcount
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+# Test block
+if __name__ == "__main__":
+    cache = DiskCache(os.path.join(CACHE_DIR, "selftest.sqlite"), max_entries=2)
+    cache.set("a", {"x": 1})
+    cache.set("b", [1, 2, 3])
+    cache.set("c", "latest")
+    print(f"Entries kept (max 2): {len(cache)}")
+    print(f"Lookup 'c': {cache.get('c')}")
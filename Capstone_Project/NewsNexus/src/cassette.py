@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import functools
+import threading
+from datetime import datetime
+from tracing import annotate
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # src/
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+CASSETTE_DIR = os.path.join(PROJECT_ROOT, "data", "cassettes")
+
+# off    -> tools hit live services (default)
+# record -> live calls, and every input/output/latency is appended to the cassette
+# replay -> no network: outputs are served from the cassette with recorded latencies
+CASSETTE_MODES = ("off", "record", "replay")
+CASSETTE_MODE = os.getenv("NEWSNEXUS_CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("NEWSNEXUS_CASSETTE", os.path.join(CASSETTE_DIR, "default.jsonl"))
+# Multiplier on recorded latencies during replay (0 = instant, 1 = as recorded).
+REPLAY_LATENCY_SCALE = float(os.getenv("NEWSNEXUS_REPLAY_LATENCY_SCALE", 1.0))
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a tool call was never recorded."""
+
+class Cassette:
+    """
+    A JSONL file of recorded tool calls, one call per line:
+    {"tool", "args", "output", "error", "latency", "recorded_at"}.
+    Repeated recordings of the same call are replayed in order (the last one repeats).
+    """
+
+    def __init__(self, path, mode, latency_scale=1.0):
+        # An unknown mode (e.g. a typo of "replay") must not quietly make live calls.
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {', '.join(CASSETTE_MODES)}.")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._cursor = {}
+        if mode == "replay":
+            self._load()
+
+    @staticmethod
+    def _key(tool, args):
+        return json.dumps([tool, args], sort_keys=True, ensure_ascii=False)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette not found: {self.path}. Record one first with NEWSNEXUS_CASSETTE_MODE=record.")
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(self._key(entry["tool"], entry["args"]), []).append(entry)
+        print(f"[Cassette] Loaded {sum(len(v) for v in self._entries.values())} recorded calls from {self.path}")
+
+    def record(self, tool, args, output, latency, error=None):
+        entry = {
+            "tool": tool,
+            "args": args,
+            "output": output,
+            "error": error,
+            "latency": latency,
+            "recorded_at": str(datetime.now()),
+        }
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def replay(self, tool, args):
+        key = self._key(tool, args)
+        with self._lock:
+            recordings = self._entries.get(key)
+            if not recordings:
+                raise CassetteMiss(f"No recording for {tool}{tuple(args)} in {self.path}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            entry = recordings[min(index, len(recordings) - 1)]
+
+        if self.latency_scale > 0:
+            time.sleep(entry["latency"] * self.latency_scale)
+        if entry["error"] is not None:
+            raise RuntimeError(entry["error"])
+        return entry["output"]
+
+_active = None
+_active_lock = threading.Lock()
+
+def get_cassette():
+    global _active
+    with _active_lock:
+        if _active is None and CASSETTE_MODE != "off":
+            _active = Cassette(CASSETTE_PATH, CASSETTE_MODE, REPLAY_LATENCY_SCALE)
+        return _active
+
+def use_cassette(mode, path=CASSETTE_PATH, latency_scale=REPLAY_LATENCY_SCALE):
+    """Switches record/replay at runtime (e.g. from a benchmark script). mode='off' disables it."""
+    global _active
+    with _active_lock:
+        _active = Cassette(path, mode, latency_scale) if mode != "off" else None
+    return _active
+
+def cassette(tool_name):
+    """Decorator making a tool function recordable/replayable. Arguments and outputs must be JSON-serialisable."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            active = get_cassette()
+            if active is None:
+                return fn(*args)
+            annotate(cassette=active.mode)
+            if active.mode == "replay":
+                return active.replay(tool_name, list(args))
+
+            start = time.time()
+            try:
+                output = fn(*args)
+            except Exception as e:
+                active.record(tool_name, list(args), None, time.time() - start, error=f"{type(e).__name__}: {e}")
+                raise
+            active.record(tool_name, list(args), output, time.time() - start)
+            return output
+        return wrapper
+    return decorator
+
+# Test block
+if __name__ == "__main__":
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "demo.jsonl")
+
+    @cassette("echo")
+    def echo(text):
+        time.sleep(0.2)
+        return [text.upper()]
+
+    use_cassette("record", path)
+    print("Recorded:", echo("hello"))
+    use_cassette("replay", path, latency_scale=0.5)
+    start = time.time()
+    print("Replayed:", echo("hello"), f"in {time.time() - start:.2f}s")
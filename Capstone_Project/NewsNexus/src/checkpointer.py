@@ -0,0 +1,220 @@
+import os
+import time
+import uuid
+import zlib
+import sqlite3
+import threading
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.join(BASE_DIR, "..")
+CHECKPOINT_DB = os.getenv("NEWSNEXUS_CHECKPOINT_DB", os.path.join(PROJECT_ROOT, "data", "checkpoints", "sessions.sqlite"))
+
+# Pruning: each thread keeps its newest checkpoints only (enough to resume a paused
+# review), and threads untouched for CHECKPOINT_MAX_AGE_DAYS are dropped entirely.
+CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("NEWSNEXUS_CHECKPOINT_KEEP", 5))
+CHECKPOINT_MAX_AGE_DAYS = float(os.getenv("NEWSNEXUS_CHECKPOINT_MAX_AGE_DAYS", 14))
+# Serialized values at least this large are zlib-compressed (research findings, drafts).
+COMPRESS_MIN_BYTES = 512
+COMPRESSED_PREFIX = "zlib+"
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+class CompressedSerializer:
+    """
+    Wraps LangGraph's default serializer and zlib-compresses large payloads.
+    The type tag records whether a value was compressed, so checkpoints written
+    before compression was switched on still load.
+    """
+
+    def __init__(self, inner=None):
+        if inner is None:
+            from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+            inner = JsonPlusSerializer()
+        self.inner = inner
+
+    def dumps_typed(self, obj):
+        type_, data = self.inner.dumps_typed(obj)
+        if isinstance(data, bytes) and len(data) >= COMPRESS_MIN_BYTES:
+            return COMPRESSED_PREFIX + type_, zlib.compress(data, 6)
+        return type_, data
+
+    def loads_typed(self, data):
+        type_, payload = data
+        if type_.startswith(COMPRESSED_PREFIX):
+            return self.inner.loads_typed((type_[len(COMPRESSED_PREFIX):], zlib.decompress(payload)))
+        return self.inner.loads_typed((type_, payload))
+
+    def __getattr__(self, name):
+        # dumps/loads (untyped) and anything newer go straight to the wrapped serializer
+        return getattr(self.inner, name)
+
+def get_checkpointer():
+    """
+    Process-wide SqliteSaver shared by every graph, keyed by thread_id.
+    Paused reviews survive restarts. Old checkpoints are pruned when it is first opened.
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+
+            os.makedirs(os.path.dirname(CHECKPOINT_DB), exist_ok=True)
+            conn = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            _checkpointer = SqliteSaver(conn, serde=CompressedSerializer())
+            _checkpointer.setup()
+            try:
+                prune()
+                collect_blobs()
+            except Exception as e:
+                print(f"   > [Checkpoints] Pruning skipped: {e}")
+        return _checkpointer
+
+def _checkpoint_time(checkpoint_id: str):
+    """Unix time encoded in a LangGraph checkpoint id (a UUIDv6), or None."""
+    try:
+        value = uuid.UUID(checkpoint_id).int
+    except (ValueError, TypeError):
+        return None
+    if (value >> 76) & 0xF != 6:
+        return None
+    timestamp = ((value >> 80) << 12) | ((value >> 64) & 0xFFF)  # 100ns ticks since 1582-10-15
+    return (timestamp - 0x01B21DD213814000) / 1e7
+
+def _connect():
+    conn = sqlite3.connect(CHECKPOINT_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+def _delete_checkpoints(conn, thread_id, checkpoint_ns, checkpoint_ids):
+    for checkpoint_id in checkpoint_ids:
+        for table in ("writes", "checkpoints"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+
+def prune(keep_last=CHECKPOINT_KEEP_PER_THREAD, max_age_days=CHECKPOINT_MAX_AGE_DAYS, vacuum=False):
+    """
+    Deletes all but the newest `keep_last` checkpoints of every thread and
+    namespace, and every thread whose newest checkpoint is older than
+    `max_age_days`. Returns {"checkpoints_deleted", "threads_deleted"}.
+    """
+    if not os.path.exists(CHECKPOINT_DB):
+        return {"checkpoints_deleted": 0, "threads_deleted": 0}
+    cutoff = time.time() - max_age_days * 86400
+    deleted = threads = 0
+    conn = _connect()
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "checkpoints" not in tables:
+            return {"checkpoints_deleted": 0, "threads_deleted": 0}
+
+        # Checkpoint ids are time-ordered UUIDv6 strings, so ordering by id is ordering by time.
+        for (thread_id,) in conn.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall():
+            newest = conn.execute(
+                "SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+            created = _checkpoint_time(newest)
+            if created is not None and created < cutoff:
+                conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                deleted += conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)).rowcount
+                threads += 1
+                continue
+
+            for (checkpoint_ns,) in conn.execute(
+                "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchall():
+                stale = [row[0] for row in conn.execute(
+                    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                    (thread_id, checkpoint_ns, keep_last),
+                )]
+                _delete_checkpoints(conn, thread_id, checkpoint_ns, stale)
+                deleted += len(stale)
+        conn.commit()
+        if vacuum and deleted:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+    if deleted:
+        print(f"   > [Checkpoints] Pruned {deleted} checkpoints ({threads} expired threads).")
+    return {"checkpoints_deleted": deleted, "threads_deleted": threads}
+
+def clear_thread(thread_id: str):
+    """Forgets a session entirely, e.g. before reusing a fixed CLI thread_id for a new topic."""
+    if not os.path.exists(CHECKPOINT_DB):
+        return
+    conn = _connect()
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in ("writes", "checkpoints"):
+            if table in tables:
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+def live_blob_digests():
+    """
+    Digests of every blob reference (see blob_store.py) held by a stored checkpoint,
+    pending write or checkpoint metadata. References are plain strings inside the
+    serialized values, so a byte scan finds them without deserializing any state.
+    """
+    from blob_store import REF_DIGEST_RE
+
+    live = set()
+    if not os.path.exists(CHECKPOINT_DB):
+        return live
+    conn = _connect()
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        queries = []
+        if "checkpoints" in tables:
+            queries.append("SELECT type, checkpoint, metadata FROM checkpoints")
+        if "writes" in tables:
+            queries.append("SELECT type, value, NULL FROM writes")
+        for query in queries:
+            for type_, payload, metadata in conn.execute(query):
+                if isinstance(payload, bytes) and (type_ or "").startswith(COMPRESSED_PREFIX):
+                    payload = zlib.decompress(payload)
+                for chunk in (payload, metadata):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode("utf-8")
+                    if chunk:
+                        live.update(m.decode("ascii") for m in REF_DIGEST_RE.findall(chunk))
+    finally:
+        conn.close()
+    return live
+
+def collect_blobs():
+    """Deletes blobs that no remaining checkpoint refers to (run after prune())."""
+    from blob_store import sweep
+    return sweep(live_blob_digests())
+
+def stats():
+    """Checkpoint store size, for the CLI and the sidebar."""
+    if not os.path.exists(CHECKPOINT_DB):
+        return {"threads": 0, "checkpoints": 0, "size_kb": 0}
+    conn = _connect()
+    try:
+        threads, checkpoints = conn.execute(
+            "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        threads = checkpoints = 0
+    finally:
+        conn.close()
+    size = sum(os.path.getsize(p) for p in (CHECKPOINT_DB, CHECKPOINT_DB + "-wal") if os.path.exists(p))
+    return {"threads": threads, "checkpoints": checkpoints, "size_kb": round(size / 1024, 1)}
+
+# Test block
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "prune":
+        print(prune(vacuum=True))
+        print({"blobs_deleted": collect_blobs()})
+    print(stats())
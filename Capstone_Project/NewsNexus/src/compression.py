@@ -0,0 +1,131 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from findings import group_findings, group_header, render_group
+from tracing import bind_context
+from token_budget import usage_record
+
+# --- Configuration ---
+# Research text larger than this (characters) is condensed before the Analyst sees it.
+ANALYST_TARGET_CHARS = int(os.getenv("NEWSNEXUS_ANALYST_TARGET_CHARS", 12000))
+COMPRESSION_WORKERS = int(os.getenv("NEWSNEXUS_COMPRESSION_WORKERS", 4))
+# Share of a condensed group's budget its source links may take; the rest is facts.
+CITATION_SHARE = 0.35
+
+MAP_PROMPT = """You are a research assistant condensing raw search results for a senior analyst.
+Extract the key facts, figures (percentages, market sizes, years) and claims from the numbered sources below.
+Write at most {max_chars} characters as short bullet points.
+End every bullet with the number(s) of the source(s) it came from, e.g. [2] or [1][3].
+Do not invent facts and do not add an introduction.
+
+SOURCES ({header}):
+{sources}
+"""
+
+def _numbered_sources(items):
+    return "\n\n".join(
+        f"[{n}] {item['title']}\n{item['snippet']}" for n, item in enumerate(items, 1)
+    )
+
+def _citation_list(items, cited=None, max_chars=None):
+    # Built from the records, not the model output, so cited links survive compression.
+    # `cited` keeps only those source numbers; `max_chars` caps the list.
+    lines, size = [], 0
+    for n, item in enumerate(items, 1):
+        if cited is not None and n not in cited:
+            continue
+        line = f"[{n}] [{item['title']}]({item['url']})"
+        if max_chars is not None and size + len(line) + 1 > max_chars:
+            break
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+def _trim_lines(text, max_chars):
+    """`text` cut to `max_chars` at the last complete line (a lone long first line is cut at a word)."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    end = cut.rfind("\n")
+    if end <= 0:
+        end = cut.rfind(" ")
+    return cut[:end].rstrip() if end > 0 else cut
+
+def _condense_group(llm, source, query, items, max_chars):
+    """
+    Map step: one group of findings -> (bullet facts with numbered citations,
+    was_condensed, token usage record of the model call or None).
+    """
+    verbatim = render_group(source, query, items)
+    if len(verbatim) <= max_chars:
+        return verbatim, False, None
+
+    header = group_header(source, query)
+    # Source links get their own capped share, so a long citation list cannot crowd out the facts.
+    citation_budget = int(max_chars * CITATION_SHARE)
+    fact_budget = max(max_chars - len(header) - min(len(_citation_list(items)), citation_budget) - 32, 200)
+    usage = None
+    try:
+        prompt = MAP_PROMPT.format(max_chars=fact_budget, header=header, sources=_numbered_sources(items))
+        response = llm.invoke(prompt)
+        usage = usage_record("compressor", prompt, response)
+        facts = _trim_lines(response.content.strip(), fact_budget)
+    except Exception as e:
+        print(f"   > [Compression] Map step failed for '{query}': {e}. Truncating instead.")
+        facts = _trim_lines(_numbered_sources(items), fact_budget)
+    cited = {int(n) for n in re.findall(r"\[(\d+)\]", facts)}
+    citations = _citation_list(items, cited or None, citation_budget)
+    return f"{header}\nKey Facts:\n{facts}\nSources:\n{citations}", True, usage
+
+def compress_findings(findings, llm, target_chars=ANALYST_TARGET_CHARS, workers=COMPRESSION_WORKERS):
+    """
+    Returns (blocks, stats); blocks are {"source", "query", "text"} dicts in
+    research order, ready to be joined into the Analyst prompt. If the rendered
+    findings already fit in `target_chars` they are returned unchanged. Otherwise
+    each (source, query) group is condensed in parallel (map) to its share of the
+    budget, and the condensed groups are kept in their original order (reduce).
+    Links are kept as numbered citations. stats["token_usage"] holds one
+    "compressor" usage record per map call.
+    """
+    groups = list(group_findings(findings).items())
+    rendered = [render_group(source, query, items) for (source, query), items in groups]
+    raw_chars = len("\n\n".join(rendered))
+    stats = {"input_chars": raw_chars, "output_chars": raw_chars, "groups_condensed": 0, "token_usage": []}
+    if raw_chars <= target_chars or not groups:
+        return [{"source": s, "query": q, "text": t} for ((s, q), _), t in zip(groups, rendered)], stats
+
+    per_group = target_chars // len(groups)
+    print(f"   > [Compression] {raw_chars} chars over {target_chars} target; "
+          f"condensing {len(groups)} groups to ~{per_group} chars each...")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compress") as executor:
+        condensed = list(executor.map(
+            bind_context(lambda group: _condense_group(llm, group[0][0], group[0][1], group[1], per_group)), groups
+        ))
+
+    blocks = [{"source": s, "query": q, "text": text} for ((s, q), _), (text, _, _) in zip(groups, condensed)]
+    stats.update(
+        output_chars=len("\n\n".join(b["text"] for b in blocks)),
+        groups_condensed=sum(1 for _, was_condensed, _ in condensed if was_condensed),
+        token_usage=[usage for _, _, usage in condensed if usage],
+    )
+    print(f"   > [Compression] Reduced research data to {stats['output_chars']} chars.")
+    return blocks, stats
+
+# Test block
+if __name__ == "__main__":
+    from findings import make_finding
+
+    class FirstLines:
+        """Stand-in model: keeps the first line of each numbered source."""
+        def invoke(self, prompt):
+            from types import SimpleNamespace
+            lines = [l for l in prompt.split("SOURCES", 1)[1].splitlines() if l.startswith("[")]
+            return SimpleNamespace(content="\n".join(f"- {l[4:]} {l[:3]}" for l in lines))
+
+    sample = [
+        make_finding(f"https://example.com/{q}/{i}", f"Story {i} on {q}", "Lorem ipsum dolor sit amet. " * 40, "web", q)
+        for q in ("ai chips", "ai market") for i in range(5)
+    ]
+    blocks, stats = compress_findings(sample, FirstLines(), target_chars=3000)
+    print(stats)
+    print("\n\n".join(b["text"] for b in blocks))
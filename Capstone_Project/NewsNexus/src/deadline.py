@@ -0,0 +1,108 @@
+import os
+import time
+
+from ollama_models import SMALL_MODEL, resolve_route
+from tracing import annotate
+
+# --- Configuration ---
+# Time budget (seconds) for a run started from the UI or the job API when the caller
+# gives none. 0 means no deadline: every stage runs at full quality.
+RUN_DEADLINE_SECONDS = float(os.getenv("NEWSNEXUS_RUN_DEADLINE", 0))
+# Rough seconds each stage needs at full quality on the default models. A stage
+# degrades when the time left does not cover it plus the stages after it.
+STAGE_ORDER = ("Researcher", "Analyst", "Writer")
+STAGE_SECONDS = {
+    "Researcher": float(os.getenv("NEWSNEXUS_RESEARCHER_SECONDS", 20)),
+    "Analyst": float(os.getenv("NEWSNEXUS_ANALYST_SECONDS", 40)),
+    "Writer": float(os.getenv("NEWSNEXUS_WRITER_SECONDS", 60)),
+}
+# Below this share of the needed time a stage takes its strongest degradations.
+CRITICAL_RATIO = 0.5
+# What the degradations fall back to.
+MIN_RESEARCH_SECONDS = 5       # the tool fan-out always gets at least this long
+DEGRADED_SOURCE_BUDGET = 15    # research items kept when time is critical
+DEGRADED_NUM_PREDICT = {"analyst": 768, "writer": 1024}
+MIN_SECTION_TOKENS = 256       # per-section floor when the Writer's limit is split
+
+# Levels returned by pressure(), mildest first.
+OK, TIGHT, CRITICAL = "ok", "tight", "critical"
+
+def with_deadline(config, seconds=None):
+    """
+    `config` with an absolute deadline `seconds` from now in
+    config["configurable"]["deadline"] (default RUN_DEADLINE_SECONDS; 0 or
+    less leaves the run without one). Anchored once, so every node of the run
+    measures against the same moment.
+    """
+    seconds = RUN_DEADLINE_SECONDS if seconds is None else seconds
+    configurable = dict((config or {}).get("configurable") or {})
+    if seconds and seconds > 0:
+        configurable["deadline"] = time.time() + seconds
+    return {**(config or {}), "configurable": configurable}
+
+def time_left(config):
+    """Seconds until this run's deadline (negative once past), or None without one."""
+    deadline = ((config or {}).get("configurable") or {}).get("deadline")
+    return None if deadline is None else deadline - time.time()
+
+def reserve_after(stage):
+    """Seconds the stages after `stage` need at full quality."""
+    return sum(STAGE_SECONDS[s] for s in STAGE_ORDER[STAGE_ORDER.index(stage) + 1:])
+
+def pressure(config, stage):
+    """
+    OK, TIGHT or CRITICAL for `stage` given the time left, or None when the
+    run has no deadline. TIGHT: less time than this stage and the later ones
+    need; CRITICAL: less than CRITICAL_RATIO of it.
+    """
+    left = time_left(config)
+    if left is None:
+        return None
+    ratio = left / (STAGE_SECONDS[stage] + reserve_after(stage))
+    if ratio >= 1:
+        return OK
+    return TIGHT if ratio >= CRITICAL_RATIO else CRITICAL
+
+def route_override(config, route, **params):
+    """`config` with extra per-run model parameters for one route (see ollama_models.resolve_route)."""
+    configurable = dict((config or {}).get("configurable") or {})
+    models = {name: dict(params_) for name, params_ in (configurable.get("models") or {}).items()}
+    models[route] = {**models.get(route, {}), **params}
+    configurable["models"] = models
+    return {**(config or {}), "configurable": configurable}
+
+def smaller_model(config, route):
+    """`config` routing `route` to SMALL_MODEL, or None if that would not change the model."""
+    degraded = route_override(config, route, model=SMALL_MODEL)
+    if resolve_route(route, degraded)["model"] == resolve_route(route, config)["model"]:
+        return None
+    return degraded
+
+def degradation(node, action, config, **detail):
+    """
+    Record of one degradation for AgentState["degradations"]; also logged and
+    added to the node's trace span.
+    """
+    left = time_left(config)
+    record = {"node": node, "action": action,
+              "time_left_s": round(left, 1) if left is not None else None, **detail}
+    print(f"   > [Deadline] {describe(record)}")
+    annotate(**{f"degraded_{action}": True})
+    return record
+
+def describe(record) -> str:
+    """One line for the UI / API, e.g. 'Writer: smaller model (llama3.2:1b) at 12.0s left'."""
+    detail = ", ".join(f"{k}={v}" for k, v in record.items() if k not in ("node", "action", "time_left_s"))
+    text = f"{record['node']}: {record['action'].replace('_', ' ')}"
+    if detail:
+        text += f" ({detail})"
+    if record.get("time_left_s") is not None:
+        text += f" at {record['time_left_s']}s left"
+    return text
+
+# Test block
+if __name__ == "__main__":
+    for seconds in (600, 90, 30):
+        config = with_deadline({"configurable": {"thread_id": "demo"}}, seconds)
+        print(f"{seconds:>4}s budget:", {stage: pressure(config, stage) for stage in STAGE_ORDER})
+    degradation("Writer", "writer_tokens", with_deadline({}, 42), num_predict=1024)
@@ -0,0 +1,162 @@
+import time
+import calendar
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from resilience import call_with_deadline, CircuitOpenError, RSS_FEED_DEADLINE
+
+# --- Configuration ---
+# Industry feeds and how often (seconds) each one is worth re-checking.
+FEEDS = {
+    "https://www.technologyreview.com/feed/": 30 * 60,
+    "https://openai.com/news/rss.xml": 60 * 60,
+    "https://machinelearning.apple.com/rss.xml": 6 * 60 * 60,
+    "https://feeds.feedburner.com/TheHackersNews": 15 * 60,
+    "https://techcrunch.com/feed/": 15 * 60,
+}
+FEED_FETCH_WORKERS = 5
+# Feed downloads run on their own bounded pool (see resilience.call_with_deadline), so a
+# slow feed host can never take the threads web search and RAG lookups need.
+_feed_call_pool = ThreadPoolExecutor(max_workers=2 * FEED_FETCH_WORKERS, thread_name_prefix="feed-call")
+# A feed that failed is retried after FEED_RETRY_SECONDS, doubling per consecutive
+# failure up to its normal interval, so dead feeds are not re-fetched on every query.
+FEED_RETRY_SECONDS = 60
+
+def _entry_timestamp(entry):
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return calendar.timegm(parsed) if parsed else None
+
+def _simplify_entry(entry, feed_title):
+    """Keeps only the plain fields we search on, so cached entries are cheap to hold and share."""
+    return {
+        "feed": feed_title,
+        "title": entry.get("title", ""),
+        "link": entry.get("link", ""),
+        "summary": entry.get("summary", ""),
+        "published": _entry_timestamp(entry),
+    }
+
+def _parse_feed(url, etag=None, modified=None):
+    """
+    Conditional GET of one feed, parsed with feedparser. The download goes through
+    requests with a socket timeout (feedparser's own fetcher has none, so an abandoned
+    call would hold its thread forever). Unreadable feeds raise so the breaker counts them.
+    """
+    import feedparser
+    import requests
+
+    headers = {"User-Agent": "NewsNexus/1.0 (+feedparser)"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    response = requests.get(url, headers=headers, timeout=RSS_FEED_DEADLINE)
+    if response.status_code == 304:
+        return feedparser.FeedParserDict(status=304, entries=[], feed={})
+    response.raise_for_status()
+
+    feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+    if feed.bozo and not feed.entries:
+        raise RuntimeError(f"unreadable feed: {feed.get('bozo_exception')}")
+    feed["status"] = response.status_code
+    feed["etag"] = response.headers.get("ETag")
+    feed["modified"] = response.headers.get("Last-Modified")
+    return feed
+
+class FeedCache:
+    """
+    Process-wide cache of parsed RSS entries.
+    Feeds are fetched concurrently, each on its own refresh interval, using
+    ETag / Last-Modified so unchanged feeds cost a 304 instead of a download.
+    """
+
+    def __init__(self, feeds=None):
+        self.feeds = dict(feeds or FEEDS)
+        self._state = {
+            url: {"title": "Industry News", "entries": [], "etag": None, "modified": None,
+                  "fetched_at": 0.0, "failures": 0}
+            for url in self.feeds
+        }
+        self._feed_locks = {url: threading.Lock() for url in self.feeds}
+        self._pool = ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS, thread_name_prefix="feed-fetch")
+
+    def _is_due(self, url, now):
+        state = self._state[url]
+        interval = self.feeds[url]
+        if state["failures"]:
+            interval = min(FEED_RETRY_SECONDS * 2 ** (state["failures"] - 1), interval)
+        return now - state["fetched_at"] >= interval
+
+    def _failed(self, state):
+        # fetched_at records the attempt, so _is_due backs off from it.
+        state["failures"] += 1
+        state["fetched_at"] = time.time()
+
+    def _fetch(self, url, force=False):
+        # One fetch per feed at a time; late arrivals reuse the result.
+        with self._feed_locks[url]:
+            state = self._state[url]
+            if not force and not self._is_due(url, time.time()):
+                return
+            try:
+                # Hung hosts are cut off at RSS_FEED_DEADLINE, and a feed that keeps
+                # failing is skipped (still serving cached entries) during its cool-down.
+                feed = call_with_deadline(_parse_feed, url, etag=state["etag"], modified=state["modified"],
+                                          timeout=RSS_FEED_DEADLINE, endpoint=url, pool=_feed_call_pool)
+            except CircuitOpenError:
+                self._failed(state)
+                return
+            except Exception as e:
+                # Broken or unreachable feed: keep serving what we had.
+                print(f"   > [Feeds] Fetch failed for {url}: {e}")
+                self._failed(state)
+                return
+
+            state["failures"] = 0
+            if getattr(feed, "status", None) == 304:
+                state["fetched_at"] = time.time()
+                return
+
+            title = feed.feed.get("title", "Industry News")
+            state.update(
+                title=title,
+                entries=[_simplify_entry(e, title) for e in feed.entries],
+                etag=feed.get("etag"),
+                modified=feed.get("modified"),
+                fetched_at=time.time(),
+            )
+
+    def refresh(self, force=False):
+        """Fetches every feed whose refresh interval has elapsed, in parallel."""
+        now = time.time()
+        due = [url for url in self.feeds if force or self._is_due(url, now)]
+        if due:
+            list(self._pool.map(lambda url: self._fetch(url, force), due))
+        return len(due)
+
+    def snapshot(self, refresh=True):
+        """Returns [(feed_title, entries)] in FEEDS order."""
+        if refresh:
+            self.refresh()
+        return [(self._state[url]["title"], list(self._state[url]["entries"])) for url in self.feeds]
+
+_feed_cache = None
+_feed_cache_lock = threading.Lock()
+
+def get_feed_cache() -> FeedCache:
+    global _feed_cache
+    with _feed_cache_lock:
+        if _feed_cache is None:
+            _feed_cache = FeedCache()
+        return _feed_cache
+
+# Test block
+if __name__ == "__main__":
+    cache = get_feed_cache()
+    start = time.time()
+    cache.refresh(force=True)
+    print(f"Cold refresh of {len(cache.feeds)} feeds: {time.time() - start:.2f}s")
+    start = time.time()
+    feeds = cache.snapshot()
+    print(f"Warm snapshot: {time.time() - start:.4f}s")
+    for title, entries in feeds:
+        print(f" - {title}: {len(entries)} entries")
@@ -0,0 +1,129 @@
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# --- Configuration ---
+NEAR_DUP_THRESHOLD = 0.8  # Jaccard similarity of word shingles above which two findings are "the same"
+SHINGLE_SIZE = 3
+# Query keys dropped from URLs before comparing them: exact names, plus the utm_* family.
+# Matching is exact on purpose, so real parameters such as "reference" or "refid" survive.
+TRACKING_PARAMS = frozenset(("fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "guccounter", "cmpid"))
+TRACKING_PREFIXES = ("utm_",)
+
+SOURCE_LABELS = {"web": "Web Search", "rss": "RSS Feeds", "rag": "Internal Database"}
+
+# A finding is a plain dict so it can live in AgentState and be checkpointed:
+# {"url", "title", "snippet", "source" ("web" | "rss" | "rag"), "query", "publisher"}
+
+def make_finding(url, title, snippet, source, query, publisher=""):
+    return {
+        "url": url or "",
+        "title": title or "Source",
+        "snippet": snippet or "",
+        "source": source,
+        "query": query,
+        "publisher": publisher,
+    }
+
+def canonical_url(url: str) -> str:
+    """Normalises a URL so the same article found via different routes compares equal."""
+    if not url or url == "#":
+        return ""
+    parts = urlsplit(url.strip())
+    if parts.scheme == "file":
+        return url.strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m."):
+        host = host[2:]
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+def _shingles(text: str):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def _similarity(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class FindingDeduper:
+    """
+    Incremental duplicate filter: add() returns True only for findings that
+    are new by canonical URL and not a near-duplicate of anything kept so far.
+    Internal documents share one file URL across many chunks, so those are
+    compared on text only.
+    """
+
+    def __init__(self):
+        self.seen_urls = set()
+        self.kept = []
+        self._kept_shingles = []
+
+    def add(self, finding) -> bool:
+        key = canonical_url(finding["url"]) if finding["source"] != "rag" else ""
+        if key and key in self.seen_urls:
+            return False
+        shingles = _shingles(f"{finding['title']} {finding['snippet']}")
+        if any(_similarity(shingles, other) >= NEAR_DUP_THRESHOLD for other in self._kept_shingles):
+            return False
+        if key:
+            self.seen_urls.add(key)
+        self.kept.append(finding)
+        self._kept_shingles.append(shingles)
+        return True
+
+def dedupe_findings(findings):
+    """Drops repeats by canonical URL and near-duplicate text, keeping the first occurrence (plan order)."""
+    deduper = FindingDeduper()
+    for finding in findings:
+        deduper.add(finding)
+    return deduper.kept
+
+def format_finding(finding) -> str:
+    """Renders one finding in the same text layout the tools have always returned."""
+    title, url = finding["title"], finding["url"]
+    if finding["source"] == "rag":
+        return f"Content: {finding['snippet']}\nSource Link: [{title}]({url})"
+    if finding["source"] == "rss":
+        return (f"Source: {finding['publisher'] or 'Industry News'}\nTitle: {title}\nLink: [{title}]({url})\n"
+                f"Summary: {finding['snippet'][:250]}...")
+    return f"Title: {title}\nLink: [{title}]({url})\nSnippet: {finding['snippet']}"
+
+def group_findings(findings):
+    """Returns {(source, query): [findings]} in first-seen order."""
+    groups = {}
+    for finding in findings:
+        groups.setdefault((finding["source"], finding["query"]), []).append(finding)
+    return groups
+
+def group_header(source, query) -> str:
+    label = SOURCE_LABELS.get(source, source)
+    scope = "Topic" if source == "rag" else "Query"
+    return f"Source: {label} ({scope}: {query})"
+
+def render_group(source, query, items) -> str:
+    separator = "\n\n" if source == "rag" else "\n\n---\n"
+    data = separator.join(format_finding(f) for f in items)
+    return f"{group_header(source, query)}\nData: {data}"
+
+def render_findings(findings):
+    """Groups findings by (source, query), in first-seen order, into research_data blocks."""
+    return [render_group(source, query, items) for (source, query), items in group_findings(findings).items()]
+
+# Test block
+if __name__ == "__main__":
+    sample = [
+        make_finding("https://www.example.com/story/?utm_source=x", "AI chips surge", "Nvidia and AMD report record demand for AI chips.", "web", "ai chips"),
+        make_finding("https://example.com/story", "AI chips surge", "Same story via RSS.", "rss", "ai chips", "Example"),
+        make_finding("https://other.com/a", "AI chips surge again", "Nvidia and AMD report record demand for AI chips.", "web", "ai market"),
+        make_finding("https://other.com/b", "Chip export rules", "New export controls on accelerators.", "web", "ai market"),
+    ]
+    unique = dedupe_findings(sample)
+    print(f"{len(sample)} findings -> {len(unique)} after dedup")
+    print("\n\n".join(render_findings(unique)))
@@ -48,8 +48,8 @@ def ingest_documents(progress_callback=None, resume=True):
             print(f"Resuming from chunk {start_chunk}...")
 
     # 4. Initialize Embeddings & Vector Store
-    from langchain_ollama import OllamaEmbeddings
-    embedding_model = OllamaEmbeddings(model="nomic-embed-text")
+    from ollama_models import get_embeddings
+    embedding_model = get_embeddings()
     
     vector_db = Chroma(
         embedding_function=embedding_model,
@@ -0,0 +1,567 @@
+import os
+import re
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from langchain_core.messages import HumanMessage
+from blob_store import message_text
+from checkpointer import CHECKPOINT_DB, CHECKPOINT_MAX_AGE_DAYS
+from deadline import with_deadline
+
+# --- Configuration ---
+API_HOST = os.getenv("NEWSNEXUS_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("NEWSNEXUS_API_PORT", 8765))
+# Pipeline runs and revisions executing at once; scale this (or run more server
+# processes against the same checkpoint DB) independently of any UI.
+JOB_WORKERS = int(os.getenv("NEWSNEXUS_JOB_WORKERS", 2))
+JOB_QUEUE_LIMIT = int(os.getenv("NEWSNEXUS_JOB_QUEUE_LIMIT", 50))  # queued + running before POST /jobs gets 503
+SSE_KEEPALIVE = 15  # seconds between keep-alive comments on an idle event stream
+# Events kept per job for the SSE stream (token deltas dominate); older ones are dropped
+# and a client resuming from before them starts at the oldest one kept.
+JOB_EVENT_LIMIT = int(os.getenv("NEWSNEXUS_JOB_EVENT_LIMIT", 2000))
+# A process owns the jobs it is running through a lease in the checkpoint DB, renewed
+# every JOB_LEASE_SECONDS / 3. Another process only resumes a job whose lease has expired.
+JOB_LEASE_SECONDS = int(os.getenv("NEWSNEXUS_JOB_LEASE_SECONDS", 60))
+
+# Job lifecycle: queued -> running -> review <-> revising -> approved; any step can end in failed.
+TERMINAL = ("approved", "failed")
+IDLE = ("review",) + TERMINAL
+
+class Job:
+    """
+    One research job. Its id doubles as the graph's thread_id, so the
+    checkpointer holds the state and this object only tracks progress: status,
+    timings and a bounded event log that feeds the SSE stream. Status
+    transitions happen under `lock`.
+    """
+
+    def __init__(self, job_id, topic, models=None, deadline_seconds=None):
+        self.id = job_id
+        self.topic = topic
+        self.models = models or {}
+        self.deadline_seconds = deadline_seconds  # None: NEWSNEXUS_RUN_DEADLINE
+        self.degradations = []
+        self.status = "queued"
+        self.stage = None
+        self.error = None
+        self.draft = ""
+        self.revisions = []
+        self.node_seconds = {}
+        self.created_at = str(datetime.now())
+        self.events = []
+        self.events_dropped = 0  # absolute index of events[0]
+        self.owner = None  # set when another live process holds the job's lease
+        self.lock = threading.Lock()
+        self._changed = threading.Condition()
+
+    @property
+    def config(self):
+        return {"configurable": {"thread_id": self.id, "models": self.models}}
+
+    @property
+    def event_count(self):
+        return self.events_dropped + len(self.events)
+
+    def emit(self, kind, data):
+        with self._changed:
+            self.events.append((kind, data))
+            if len(self.events) > JOB_EVENT_LIMIT + JOB_EVENT_LIMIT // 4:
+                # Trim in batches so appends stay cheap.
+                drop = len(self.events) - JOB_EVENT_LIMIT
+                del self.events[:drop]
+                self.events_dropped += drop
+            self._changed.notify_all()
+
+    def set_status(self, status, **data):
+        self.status = status
+        self.emit("status", {"status": status, **data})
+
+    def wait_for_events(self, after, timeout):
+        """
+        Blocks until there are events past index `after` (or timeout).
+        Returns (index of the first event returned, events).
+        """
+        with self._changed:
+            if self.event_count <= after:
+                self._changed.wait(timeout)
+            start = max(after, self.events_dropped)
+            return start, self.events[start - self.events_dropped:]
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "stage": self.stage,
+            "error": self.error,
+            "node_seconds": self.node_seconds,
+            "degradations": self.degradations,
+            "revisions": self.revisions,
+            "created_at": self.created_at,
+            "owner": self.owner,
+            "events": self.event_count,
+        }
+
+class JobLeases:
+    """
+    Job ownership, final status and run settings, shared by every server process
+    using the same checkpoint DB. A row's owner is the process running the job
+    (pipeline or revision); it is cleared, with the status the job ended in, when
+    the work finishes. A lease whose heartbeat is older than JOB_LEASE_SECONDS
+    belongs to a dead process and can be taken over. The models and deadline a job
+    was created with are kept too, so a process resuming it runs it the same way.
+    """
+
+    def __init__(self, path=CHECKPOINT_DB):
+        self.path = path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_leases (job_id TEXT PRIMARY KEY, status TEXT, owner TEXT, "
+                "heartbeat REAL, models TEXT, deadline_seconds REAL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(job_leases)")}
+            for column, kind in (("models", "TEXT"), ("deadline_seconds", "REAL")):
+                if column not in columns:  # table created before settings were stored
+                    conn.execute(f"ALTER TABLE job_leases ADD COLUMN {column} {kind}")
+            # Rows outlive their checkpoints by no more than checkpoint pruning allows.
+            conn.execute("DELETE FROM job_leases WHERE heartbeat < ?",
+                         (time.time() - CHECKPOINT_MAX_AGE_DAYS * 86400,))
+        finally:
+            conn.close()
+        threading.Thread(target=self._renew_forever, name="job-lease", daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, job_id):
+        """(status, owner) for a job; owner is None unless a live process other than this one holds it."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT status, owner, heartbeat FROM job_leases WHERE job_id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None, None
+        status, owner, heartbeat = row
+        live = owner and owner != self.owner and heartbeat > time.time() - JOB_LEASE_SECONDS
+        return status, owner if live else None
+
+    def settings(self, job_id):
+        """(models, deadline_seconds) the job was created with; ({}, None) if unknown."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT models, deadline_seconds FROM job_leases WHERE job_id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return {}, None
+        return json.loads(row[0]) if row[0] else {}, row[1]
+
+    def claim(self, job_id, status, job=None):
+        """
+        Takes the job's lease unless another live process holds it or the job is
+        finished. Returns True if taken. Passing the Job stores its settings.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status, owner, heartbeat FROM job_leases WHERE job_id = ?", (job_id,)).fetchone()
+            now = time.time()
+            if row is not None:
+                current, owner, heartbeat = row
+                if current in TERMINAL or (owner and owner != self.owner and heartbeat > now - JOB_LEASE_SECONDS):
+                    conn.execute("ROLLBACK")
+                    return False
+            if job is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_leases (job_id, status, owner, heartbeat, models, deadline_seconds) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, status, self.owner, now, json.dumps(job.models), job.deadline_seconds),
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO job_leases (job_id, status, owner, heartbeat) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(job_id) DO UPDATE SET status = excluded.status, owner = excluded.owner, "
+                    "heartbeat = excluded.heartbeat",
+                    (job_id, status, self.owner, now),
+                )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def release(self, job_id, status):
+        """Records the status the job's work ended in and gives up the lease."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE job_leases SET status = ?, owner = NULL, heartbeat = ? WHERE job_id = ? AND owner = ?",
+                (status, time.time(), job_id, self.owner),
+            )
+        finally:
+            conn.close()
+
+    def _renew_forever(self):
+        while True:
+            time.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute("UPDATE job_leases SET heartbeat = ? WHERE owner = ?", (time.time(), self.owner))
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"[Jobs] Lease renewal failed: {e}")
+
+class JobManager:
+    """
+    Job registry plus the worker pool that runs pipelines and revisions. Work is
+    only started under the job's lease (see JobLeases), so two server processes
+    sharing a checkpoint DB never run the same job.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, leases=None):
+        self.jobs = {}
+        self.leases = leases or JobLeases()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self._pending = 0
+
+    def _submit(self, fn, job, *args):
+        with self._lock:
+            self._pending += 1
+
+        def run():
+            try:
+                fn(job, *args)
+            except Exception as e:
+                job.error = str(e)
+                with job.lock:
+                    job.set_status("failed", error=str(e))
+                print(f"[Jobs] {job.id} failed: {e}")
+            finally:
+                self.leases.release(job.id, job.status)
+                with self._lock:
+                    self._pending -= 1
+
+        self._executor.submit(run)
+
+    def create(self, topic, models=None, deadline_seconds=None):
+        with self._lock:
+            if self._pending >= JOB_QUEUE_LIMIT:
+                return None
+            job = Job(f"job_{uuid.uuid4().hex[:12]}", topic, models, deadline_seconds)
+            self.jobs[job.id] = job
+        self.leases.claim(job.id, "queued", job)
+        job.set_status("queued")
+        self._submit(self._run_pipeline, job)
+        return job
+
+    def get(self, job_id):
+        """
+        Looks a job up, restoring it from the checkpointer after a server restart
+        or when another process created it. An unfinished pipeline is resumed here
+        only if no live process holds its lease; otherwise the job is reported with
+        its owner and is not kept in this process's registry.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is not None:
+            self._refresh(job)
+            return job
+        if not re.fullmatch(r"job_[0-9a-f]{12}", job_id):
+            return None
+
+        from agents import app as agent_app
+        saved = agent_app.get_state({"configurable": {"thread_id": job_id}})
+        if not saved.values.get("messages"):
+            return None
+        # Resumed with the routing and deadline the client asked for, not the defaults.
+        job = Job(job_id, saved.values["messages"][0].content, *self.leases.settings(job_id))
+        job.degradations = list(saved.values.get("degradations", []))
+        status, owner = self.leases.get(job_id)
+        if owner is not None:
+            job.owner = owner
+            job.status = status
+            return job
+
+        with self._lock:
+            if job_id in self.jobs:  # another request restored it meanwhile
+                return self.jobs[job_id]
+            self.jobs[job_id] = job
+        if saved.next and status not in TERMINAL and self.leases.claim(job_id, "queued"):
+            # Interrupted mid-pipeline: finish it from the last completed node.
+            job.set_status("queued", resumed=True)
+            self._submit(self._run_pipeline, job)
+        else:
+            job.draft = message_text(saved.values["messages"][-1])
+            job.set_status(status if status in TERMINAL else "review", restored=True)
+        return job
+
+    def _sync_draft(self, job):
+        # Another process may have revised the job since this one last looked at it.
+        from agents import app as agent_app
+        saved = agent_app.get_state(job.config)
+        if saved.values.get("messages"):
+            job.draft = message_text(saved.values["messages"][-1])
+
+    def _refresh(self, job):
+        """Catches a job this process is not working on up with its lease (another process may hold or have finished it)."""
+        if job.status not in IDLE and job.owner is None:
+            return  # running here
+        status, owner = self.leases.get(job.id)
+        with job.lock:
+            if owner is not None:
+                job.owner, job.status = owner, status
+            elif job.owner is not None or (status in TERMINAL and job.status != status):
+                job.owner = None
+                self._sync_draft(job)
+                job.set_status(status if status in TERMINAL else "review", restored=True)
+
+    def _run_pipeline(self, job):
+        from agents import app as agent_app
+
+        with job.lock:
+            job.set_status("running")
+        self.leases.claim(job.id, "running")  # already ours; lets other processes report it as running
+        saved = agent_app.get_state(job.config)
+        inputs = None if saved.next else {
+            "messages": [HumanMessage(content=job.topic)], "research_data": [], "chart_data": [],
+        }
+        job.degradations = list(saved.values.get("degradations", []))
+        # The deadline counts from when the job starts running, not from when it was queued.
+        config = with_deadline(job.config, job.deadline_seconds)
+        last = time.time()
+        for mode, event in agent_app.stream(inputs, config, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                job.emit("delta", event)
+                continue
+            now = time.time()
+            for node, update in event.items():
+                job.degradations.extend((update or {}).get("degradations", []))
+                job.stage = node
+                job.node_seconds[node] = round(job.node_seconds.get(node, 0) + now - last, 2)
+                job.emit("node", {"node": node, "seconds": job.node_seconds[node]})
+            last = now
+        with job.lock:
+            job.draft = message_text(agent_app.get_state(job.config).values["messages"][-1])
+            job.set_status("review")
+
+    def revise(self, job, feedback):
+        with job.lock:
+            claimed = job.status == "review" and job.owner is None and self.leases.claim(job.id, "revising")
+            if claimed:
+                self._sync_draft(job)
+                job.set_status("revising")
+        if not claimed:
+            self._refresh(job)  # so the 409 reports what another process is doing with it
+            return False
+        self._submit(self._run_revision, job, feedback)
+        return True
+
+    def _run_revision(self, job, feedback):
+        from agents import revise_newsletter, record_revision
+
+        started = time.time()
+        html, _, stats = revise_newsletter(
+            job.draft, feedback, emit=lambda event: job.emit("delta", event), config=job.config
+        )
+        record_revision(job.config, feedback, html)
+        with job.lock:
+            job.draft = html
+            job.revisions.append({"feedback": feedback, "seconds": round(time.time() - started, 2), **stats})
+            job.set_status("review")
+
+    def approve(self, job):
+        from memory_store import MemoryStore
+
+        with job.lock:
+            claimed = job.status == "review" and job.owner is None and self.leases.claim(job.id, "review")
+            if claimed:
+                try:
+                    self._sync_draft(job)
+                    MemoryStore().save_memory(job.topic, job.draft)
+                    job.set_status("approved")
+                finally:
+                    # Persisted, so a restart restores the job as approved rather than in review.
+                    self.leases.release(job.id, job.status)
+        if not claimed:
+            self._refresh(job)
+        return claimed
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                    {"topic": ..., "models": {...}} -> 202 {"job_id", ...}
+    GET  /jobs                    all jobs known to this process
+    GET  /jobs/<id>               status, stage, node timings, revisions
+    GET  /jobs/<id>/events        Server-Sent Events (status, node, delta); ?after=N to skip N events
+    GET  /jobs/<id>/draft         the current draft as text/html
+    POST /jobs/<id>/feedback      {"feedback": ...} -> patch-style revision
+    POST /jobs/<id>/approve       archive the draft and close the job
+    """
+
+    manager = None  # set by serve()
+    server_version = "NewsNexusJobs/1.0"
+
+    # --- helpers ---
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def _job_or_404(self, job_id):
+        job = self.manager.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"unknown job {job_id}"})
+        return job
+
+    def log_message(self, fmt, *args):
+        print(f"   > [API] {self.address_string()} {fmt % args}")
+
+    # --- routes ---
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["jobs"]:
+            return self._send_json(200, [job.to_dict() for job in list(self.manager.jobs.values())])
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "not found"})
+        job = self._job_or_404(parts[1])
+        if job is None:
+            return
+        if len(parts) == 2:
+            return self._send_json(200, job.to_dict())
+        if parts[2:] == ["draft"]:
+            if not job.draft:
+                return self._send_json(409, {"error": f"no draft yet (status: {job.status})"})
+            body = job.draft.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if parts[2:] == ["events"]:
+            try:
+                after = int(parse_qs(url.query).get("after", ["0"])[0] or 0)
+            except ValueError:
+                after = -1
+            if after < 0:
+                return self._send_json(400, {"error": "'after' must be a non-negative integer"})
+            if job.owner is not None:
+                return self._send_json(409, {"error": f"job is held by {job.owner}; stream it from that server"})
+            return self._stream_events(job, after)
+        return self._send_json(404, {"error": "not found"})
+
+    def _stream_events(self, job, after):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        sent = after
+        try:
+            while True:
+                sent, events = job.wait_for_events(sent, SSE_KEEPALIVE)
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                for kind, data in events:
+                    sent += 1
+                    self.wfile.write(f"id: {sent}\nevent: {kind}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                # Close once the job is idle and everything it emitted has been sent.
+                if job.status in IDLE and sent >= job.event_count:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def do_POST(self):
+        parts = [p for p in urlsplit(self.path).path.split("/") if p]
+        payload = self._read_json()
+        if payload is None:
+            return self._send_json(400, {"error": "body must be a JSON object"})
+
+        if parts == ["jobs"]:
+            topic = str(payload.get("topic", "")).strip()
+            if not topic:
+                return self._send_json(400, {"error": "'topic' is required"})
+            models = payload.get("models")
+            if models is not None and not isinstance(models, dict):
+                return self._send_json(400, {"error": "'models' must be an object"})
+            deadline_seconds = payload.get("deadline_seconds")
+            if deadline_seconds is not None and not isinstance(deadline_seconds, (int, float)):
+                return self._send_json(400, {"error": "'deadline_seconds' must be a number"})
+            job = self.manager.create(topic, models, deadline_seconds)
+            if job is None:
+                return self._send_json(503, {"error": "job queue is full, retry later"})
+            return self._send_json(202, job.to_dict())
+
+        if len(parts) != 3 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "not found"})
+        job = self._job_or_404(parts[1])
+        if job is None:
+            return
+        if parts[2] == "feedback":
+            feedback = str(payload.get("feedback", "")).strip()
+            if not feedback:
+                return self._send_json(400, {"error": "'feedback' is required"})
+            if not self.manager.revise(job, feedback):
+                return self._send_json(409, {"error": f"job is {job.status}, not awaiting review"})
+            return self._send_json(202, job.to_dict())
+        if parts[2] == "approve":
+            if not self.manager.approve(job):
+                return self._send_json(409, {"error": f"job is {job.status}, not awaiting review"})
+            return self._send_json(200, job.to_dict())
+        return self._send_json(404, {"error": "not found"})
+
+def serve(host=API_HOST, port=API_PORT, workers=JOB_WORKERS):
+    import agents
+    agents.get_app()  # build the graph (and open the checkpointer) before taking requests
+    from ollama_models import start_warm_up
+
+    start_warm_up()
+    JobRequestHandler.manager = JobManager(workers)
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.daemon_threads = True
+    print(f"[API] NewsNexus job server on http://{host}:{port} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[API] Shutting down.")
+    finally:
+        server.server_close()
+
+# Test block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless HTTP job API for the NewsNexus pipeline.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
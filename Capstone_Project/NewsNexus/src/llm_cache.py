@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from cache_store import DiskCache, CACHE_DIR
+from tracing import span
+
+# --- Configuration ---
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("NEWSNEXUS_LLM_CACHE_MAX_ENTRIES", 500))
+LLM_CACHE_ENABLED = os.getenv("NEWSNEXUS_LLM_CACHE", "1") != "0"
+
+# Generation parameters that change the output and therefore belong in the key.
+CACHE_KEY_PARAMS = ("temperature", "num_predict", "num_ctx", "top_k", "top_p", "seed",
+                    "repeat_penalty", "mirostat", "stop", "format")
+
+_response_cache = None
+_in_flight = {}  # key -> Future, shared by every wrapper in the process
+_in_flight_lock = threading.Lock()
+
+def get_response_cache() -> DiskCache:
+    global _response_cache
+    with _in_flight_lock:
+        if _response_cache is None:
+            _response_cache = DiskCache(os.path.join(CACHE_DIR, "llm_responses.sqlite"), max_entries=LLM_CACHE_MAX_ENTRIES)
+        return _response_cache
+
+def _serialize_prompt(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    return [
+        [m.type, m.content] if isinstance(m, BaseMessage) else list(m) if isinstance(m, tuple) else m
+        for m in prompt
+    ]
+
+def _prompt_chars(prompt) -> int:
+    if isinstance(prompt, str):
+        return len(prompt)
+    return sum(len(str(getattr(m, "content", m))) for m in prompt)
+
+class CachedChatModel:
+    """
+    Exact-match response cache around a chat model.
+    The key is a SHA-256 over the model name, its generation parameters and the
+    prompt; entries live in a size-bounded (LRU) SQLite file so they survive
+    restarts. Identical requests that arrive while one is already running wait
+    for that call instead of generating again.
+    Only deterministic configurations (temperature 0 or a fixed seed) are cached.
+    Every invoke/stream is an "llm" span (see tracing.py) with sizes, token
+    counts and the cache outcome.
+    Anything not overridden here (bind_tools, ...) goes to the wrapped model.
+    """
+
+    def __init__(self, llm, cache: DiskCache = None):
+        self.llm = llm
+        self.cache = cache
+
+    def _params(self):
+        params = {name: getattr(self.llm, name, None) for name in CACHE_KEY_PARAMS}
+        return {k: v for k, v in params.items() if v is not None}
+
+    def _cacheable(self, params):
+        return LLM_CACHE_ENABLED and (params.get("temperature") == 0 or params.get("seed") is not None)
+
+    def cache_key(self, prompt) -> str:
+        payload = json.dumps(
+            {"model": getattr(self.llm, "model", type(self.llm).__name__), "params": self._params(),
+             "prompt": _serialize_prompt(prompt)},
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _span(self, prompt, kwargs):
+        model = getattr(self.llm, "model", type(self.llm).__name__)
+        cacheable = not kwargs and self._cacheable(self._params())
+        return span(model, "llm", leaf=True, model=model, prompt_chars=_prompt_chars(prompt),
+                    cache="miss" if cacheable else "off")
+
+    @staticmethod
+    def _trace_response(s, content, metadata, usage):
+        if metadata.get("cache_hit"):
+            s.set(cache="coalesced" if metadata.get("coalesced") else "hit")
+        s.set(completion_chars=len(content or ""),
+              prompt_tokens=(usage or {}).get("input_tokens"), completion_tokens=(usage or {}).get("output_tokens"))
+
+    def invoke(self, prompt, config=None, **kwargs):
+        with self._span(prompt, kwargs) as s:
+            response = self._invoke(prompt, config, **kwargs)
+            self._trace_response(s, response.content, getattr(response, "response_metadata", None) or {},
+                                 getattr(response, "usage_metadata", None))
+            return response
+
+    def stream(self, prompt, config=None, **kwargs):
+        """
+        Streams chunks from the model and stores the joined text on completion.
+        A cache hit (or a coalesced duplicate) arrives as a single chunk.
+        """
+        with self._span(prompt, kwargs) as s:
+            started = time.perf_counter()
+            parts, metadata, usage = [], {}, None
+            for chunk in self._stream(prompt, config, **kwargs):
+                if not parts:
+                    s.set(first_chunk_ms=round((time.perf_counter() - started) * 1000, 1))
+                parts.append(chunk.content)
+                metadata.update(getattr(chunk, "response_metadata", None) or {})
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+            self._trace_response(s, "".join(parts), metadata, usage)
+
+    def _invoke(self, prompt, config=None, **kwargs):
+        if kwargs or not self._cacheable(self._params()):
+            return self.llm.invoke(prompt, config=config, **kwargs)
+
+        cache = self.cache or get_response_cache()
+        key = self.cache_key(prompt)
+        hit = cache.get(key)
+        if hit is not None:
+            content, _ = hit
+            print("   > [LLM Cache] Hit, skipping generation.")
+            return AIMessage(content=content, response_metadata={"cache_hit": True})
+
+        with _in_flight_lock:
+            pending = _in_flight.get(key)
+            if pending is None:
+                pending = _in_flight[key] = Future()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            print("   > [LLM Cache] Identical request in flight, waiting for it.")
+            return AIMessage(content=pending.result(), response_metadata={"cache_hit": True, "coalesced": True})
+
+        try:
+            # The previous leader may have finished between our lookup and taking the lock.
+            hit = cache.get(key)
+            if hit is not None:
+                pending.set_result(hit[0])
+                return AIMessage(content=hit[0], response_metadata={"cache_hit": True})
+            response = self.llm.invoke(prompt, config=config)
+            cache.set(key, response.content)
+            pending.set_result(response.content)
+            return response
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop(key, None)
+
+    def _stream(self, prompt, config=None, **kwargs):
+        if kwargs or not self._cacheable(self._params()):
+            yield from self.llm.stream(prompt, config=config, **kwargs)
+            return
+
+        cache = self.cache or get_response_cache()
+        key = self.cache_key(prompt)
+        hit = cache.get(key)
+        if hit is not None:
+            print("   > [LLM Cache] Hit, skipping generation.")
+            yield AIMessageChunk(content=hit[0], response_metadata={"cache_hit": True})
+            return
+
+        with _in_flight_lock:
+            pending = _in_flight.get(key)
+            leader = pending is None
+            if leader:
+                pending = _in_flight[key] = Future()
+
+        if not leader:
+            print("   > [LLM Cache] Identical request in flight, waiting for it.")
+            yield AIMessageChunk(content=pending.result(), response_metadata={"cache_hit": True, "coalesced": True})
+            return
+
+        parts = []
+        try:
+            for chunk in self.llm.stream(prompt, config=config):
+                parts.append(chunk.content)
+                yield chunk
+            content = "".join(parts)
+            cache.set(key, content)
+            pending.set_result(content)
+        except BaseException as e:
+            # Includes GeneratorExit when the consumer stops early: never cache a partial answer.
+            pending.set_exception(e if isinstance(e, Exception) else RuntimeError("stream abandoned"))
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop(key, None)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+# Test block
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SlowEcho:
+        model = "echo"
+        temperature = 0
+        calls = 0
+
+        def invoke(self, prompt, config=None):
+            SlowEcho.calls += 1
+            time.sleep(0.5)
+            return AIMessage(content=prompt.upper())
+
+    llm = CachedChatModel(SlowEcho(), cache=DiskCache(os.path.join(CACHE_DIR, "llm_selftest.sqlite"), max_entries=10))
+    prompt = f"hello {time.time()}"
+    with ThreadPoolExecutor(4) as pool:
+        print([m.content for m in pool.map(lambda _: llm.invoke(prompt), range(4))])
+    print(llm.invoke(prompt).response_metadata)
+    print(f"Underlying model calls: {SlowEcho.calls}")
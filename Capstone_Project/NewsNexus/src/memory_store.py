@@ -1,17 +1,54 @@
 import os
+import json
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from ollama_models import EMBED_MODEL, get_embeddings
 
 # Configuration
 MEMORY_DB_PATH = r"D:\NIE_GENai\Capstone_Project\NewsNexus\data\archive_memory"
 COLLECTION_NAME = "newsletter_archive"
+EMBEDDING_MODEL = EMBED_MODEL
+IMPORT_PROGRESS_FILE = os.path.join(MEMORY_DB_PATH, "import_progress.json")
+
+# Bulk import/export tuning
+BULK_BATCH_SIZE = 32     # documents per embedding request
+BULK_EMBED_WORKERS = 4   # embedding batches in flight at once
+EXPORT_PAGE_SIZE = 256   # documents read from Chroma per page
+
+def _document_id(content: str, metadata: dict) -> str:
+    """Stable id so re-importing the same newsletter overwrites instead of duplicating."""
+    key = f"{metadata.get('topic', '')}\x00{metadata.get('timestamp', '')}\x00{content}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def get_import_progress(source_path):
+    """Returns how many lines of `source_path` a previous import already stored."""
+    if os.path.exists(IMPORT_PROGRESS_FILE):
+        try:
+            with open(IMPORT_PROGRESS_FILE, "r") as f:
+                prog = json.load(f)
+            if prog.get("source") == os.path.abspath(source_path) and prog.get("size") == os.path.getsize(source_path):
+                return prog.get("processed_lines", 0)
+        except: pass
+    return 0
+
+def save_import_progress(source_path, processed_lines, complete=False):
+    os.makedirs(MEMORY_DB_PATH, exist_ok=True)
+    with open(IMPORT_PROGRESS_FILE, "w") as f:
+        json.dump({
+            "source": os.path.abspath(source_path),
+            "size": os.path.getsize(source_path),
+            "processed_lines": processed_lines,
+            "is_complete": complete,
+        }, f)
 
 class MemoryStore:
     def __init__(self):
         # Initialize Ollama Embeddings for stability (nomic-embed-text)
-        from langchain_ollama import OllamaEmbeddings
-        self.embedding_fn = OllamaEmbeddings(model="nomic-embed-text")
+        self.embedding_fn = get_embeddings()
         
         # Connection to Archive Database
         self.vector_store = Chroma(
@@ -53,8 +90,178 @@ class MemoryStore:
         
         return "No prior newsletters found on this topic. You are clear to proceed."
 
-# Test block
+    # --- Bulk Import / Export ---
+
+    def export_jsonl(self, output_path: str, include_vectors=False, progress_callback=None) -> int:
+        """
+        Streams the whole archive to a JSONL file, one newsletter per line.
+        With include_vectors=True the stored embeddings are written too, so an
+        import on another host can skip re-embedding.
+        """
+        include = ["documents", "metadatas"] + (["embeddings"] if include_vectors else [])
+        total = self.vector_store._collection.count()
+        print(f"\n[Memory] Exporting {total} newsletters to {output_path}...")
+
+        written = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            while written < total:
+                page = self.vector_store.get(include=include, limit=EXPORT_PAGE_SIZE, offset=written)
+                if not page["ids"]:
+                    break
+                for i, doc_id in enumerate(page["ids"]):
+                    record = {
+                        "id": doc_id,
+                        "content": page["documents"][i],
+                        "metadata": page["metadatas"][i] or {},
+                    }
+                    if include_vectors:
+                        record["embedding"] = [float(x) for x in page["embeddings"][i]]
+                        record["embedding_model"] = EMBEDDING_MODEL
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                written += len(page["ids"])
+
+                msg = f"Exported {written}/{total} newsletters..."
+                print(f"   > {msg}")
+                if progress_callback:
+                    progress_callback(written / total if total else 1.0, msg)
+
+        print("[Memory] Export complete.")
+        return written
+
+    def import_jsonl(self, input_path: str, resume=True, progress_callback=None) -> int:
+        """
+        Streams newsletters from a JSONL file into the archive.
+        Each line needs "content" plus either a "metadata" dict or top-level
+        "topic"/"timestamp" fields. Lines carrying an "embedding" made with our
+        embedding model are stored as-is; the rest are embedded in batches of
+        BULK_BATCH_SIZE with up to BULK_EMBED_WORKERS batches in flight.
+        Progress is checkpointed per batch so an interrupted import resumes.
+        """
+        start_line = get_import_progress(input_path) if resume else 0
+        file_size = os.path.getsize(input_path)
+        if start_line:
+            print(f"\n[Memory] Resuming import of {input_path} from line {start_line}...")
+        else:
+            print(f"\n[Memory] Importing newsletters from {input_path}...")
+
+        collection = self.vector_store._collection
+        pending = deque()  # (future, batch, last_line_no, bytes_read) in file order
+        imported = 0
+
+        def embed_batch(batch):
+            missing = [r for r in batch if r["embedding"] is None]
+            if missing:
+                vectors = self.embedding_fn.embed_documents([r["content"] for r in missing])
+                for record, vector in zip(missing, vectors):
+                    record["embedding"] = vector
+            return batch
+
+        def flush_oldest():
+            nonlocal imported
+            future, _, last_line, bytes_read = pending.popleft()
+            # Chroma rejects a batch with repeated ids; a repeated record keeps its last copy.
+            batch = list({r["id"]: r for r in future.result()}.values())
+            collection.upsert(
+                ids=[r["id"] for r in batch],
+                documents=[r["content"] for r in batch],
+                metadatas=[r["metadata"] for r in batch],
+                embeddings=[r["embedding"] for r in batch],
+            )
+            imported += len(batch)
+            save_import_progress(input_path, last_line)
+
+            msg = f"Imported {imported} newsletters (line {last_line})..."
+            print(f"   > {msg}")
+            if progress_callback:
+                progress_callback(min(bytes_read / file_size, 1.0) if file_size else 1.0, msg)
+
+        with ThreadPoolExecutor(max_workers=BULK_EMBED_WORKERS) as executor, \
+                open(input_path, "r", encoding="utf-8") as f:
+            batch = []
+            bytes_read = 0
+            line_no = 0
+            for line_no, line in enumerate(f, 1):
+                bytes_read += len(line.encode("utf-8"))
+                if line_no <= start_line or not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"   ! Skipping line {line_no}: invalid JSON ({e}).")
+                    continue
+                if not isinstance(raw, dict):
+                    print(f"   ! Skipping line {line_no}: not a JSON object.")
+                    continue
+                record = self._parse_import_record(raw)
+                if record is None:
+                    print(f"   ! Skipping line {line_no}: no content.")
+                    continue
+                batch.append(record)
+
+                if len(batch) >= BULK_BATCH_SIZE:
+                    pending.append((executor.submit(embed_batch, batch), batch, line_no, bytes_read))
+                    batch = []
+                    # Keep memory bounded: write out the oldest batch before reading further.
+                    if len(pending) >= BULK_EMBED_WORKERS:
+                        flush_oldest()
+
+            if batch:
+                pending.append((executor.submit(embed_batch, batch), batch, line_no, bytes_read))
+            while pending:
+                flush_oldest()
+
+        save_import_progress(input_path, line_no, complete=True)
+        print(f"[Memory] Import complete. {imported} newsletters stored.")
+        return imported
+
+    @staticmethod
+    def _parse_import_record(raw: dict):
+        content = raw.get("content") or raw.get("page_content")
+        if not content:
+            return None
+        metadata = dict(raw.get("metadata") or {})
+        for field in ("topic", "timestamp"):
+            if field in raw and field not in metadata:
+                metadata[field] = raw[field]
+        metadata.setdefault("topic", "Unknown Topic")
+        # The id is taken before the import time is filled in, so re-importing a
+        # record without a timestamp overwrites it instead of adding a copy.
+        doc_id = raw.get("id") or _document_id(content, metadata)
+        metadata.setdefault("timestamp", str(datetime.now()))
+
+        embedding = raw.get("embedding")
+        if embedding is not None and raw.get("embedding_model", EMBEDDING_MODEL) != EMBEDDING_MODEL:
+            embedding = None  # Vectors from another model are not comparable; re-embed.
+
+        return {
+            "id": doc_id,
+            "content": content,
+            "metadata": metadata,
+            "embedding": embedding,
+        }
+
+# Test block / Bulk CLI
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="NewsNexus newsletter archive tools")
+    sub = parser.add_subparsers(dest="command")
+
+    export_cmd = sub.add_parser("export", help="Export the archive to JSONL")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--vectors", action="store_true", help="Include stored embeddings")
+
+    import_cmd = sub.add_parser("import", help="Import newsletters from JSONL")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--no-resume", action="store_true", help="Start from the first line")
+
+    args = parser.parse_args()
     mem = MemoryStore()
-    mem.save_memory("Test Topic", "This is a test newsletter content.")
-    print(mem.check_memory("Test Topic"))
\ No newline at end of file
+
+    if args.command == "export":
+        mem.export_jsonl(args.path, include_vectors=args.vectors)
+    elif args.command == "import":
+        mem.import_jsonl(args.path, resume=not args.no_resume)
+    else:
+        mem.save_memory("Test Topic", "This is a test newsletter content.")
+        print(mem.check_memory("Test Topic"))
\ No newline at end of file
@@ -0,0 +1,208 @@
+import os
+import time
+import threading
+from datetime import datetime
+from tracing import span
+
+# --- Configuration ---
+CHAT_MODEL = os.getenv("NEWSNEXUS_CHAT_MODEL", "llama3.2")
+EMBED_MODEL = os.getenv("NEWSNEXUS_EMBED_MODEL", "nomic-embed-text")
+# How long Ollama keeps a model in memory after its last request (seconds, -1 = forever).
+# Both models are pinned so they stop evicting each other between research runs.
+OLLAMA_KEEP_ALIVE = int(os.getenv("NEWSNEXUS_KEEP_ALIVE", 30 * 60))
+
+# --- Per-node Model Routing ---
+# Each stage gets its own model and generation parameters: a small, fast model where
+# the output is short and structured (query planning, outlining, condensing findings),
+# the main model for analysis and long-form writing. Per-stage env overrides:
+# NEWSNEXUS_<NODE>_MODEL. Per run: config["configurable"]["models"] = {"writer": {...}}.
+SMALL_MODEL = os.getenv("NEWSNEXUS_SMALL_MODEL", "llama3.2:1b")
+MODEL_ROUTES = {
+    "planner":    {"model": os.getenv("NEWSNEXUS_PLANNER_MODEL", SMALL_MODEL), "temperature": 0, "num_predict": 256},
+    "compressor": {"model": os.getenv("NEWSNEXUS_COMPRESSOR_MODEL", SMALL_MODEL), "temperature": 0, "num_predict": 1024},
+    "analyst":    {"model": os.getenv("NEWSNEXUS_ANALYST_MODEL", CHAT_MODEL), "temperature": 0},
+    "writer":     {"model": os.getenv("NEWSNEXUS_WRITER_MODEL", CHAT_MODEL), "temperature": 0},
+    "reviser":    {"model": os.getenv("NEWSNEXUS_REVISER_MODEL", CHAT_MODEL), "temperature": 0},
+}
+
+class TracedEmbeddings:
+    """
+    Embeddings client wrapper recording an "embedding" span (texts, characters)
+    per call inside a traced run. Everything else goes to the wrapped client.
+    """
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts):
+        with span("embed_documents", "embedding", leaf=True, model=EMBED_MODEL,
+                  texts=len(texts), chars=sum(len(t) for t in texts)):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        with span("embed_query", "embedding", leaf=True, model=EMBED_MODEL, texts=1, chars=len(text)):
+            return self.embeddings.embed_query(text)
+
+    def __getattr__(self, name):
+        return getattr(self.embeddings, name)
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def get_embeddings():
+    """Shared OllamaEmbeddings client for ingestion, retrieval and the archive."""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            from langchain_ollama import OllamaEmbeddings
+            _embeddings = TracedEmbeddings(OllamaEmbeddings(model=EMBED_MODEL, keep_alive=OLLAMA_KEEP_ALIVE))
+        return _embeddings
+
+def _model_tag(name: str) -> str:
+    """Ollama's full name for `name`: an untagged model means its ":latest" tag."""
+    return name if ":" in name else f"{name}:latest"
+
+_local_models = None
+_local_models_lock = threading.Lock()
+# While Ollama is unreachable, /api/tags is asked again at most once per this many seconds.
+OLLAMA_RETRY_SECONDS = 30
+_local_models_failed_at = 0.0
+
+def _installed(model: str) -> bool:
+    """True if Ollama has `model` pulled (or cannot be asked, so we let the call itself fail)."""
+    global _local_models, _local_models_failed_at
+    with _local_models_lock:
+        if _local_models is None:
+            if time.time() - _local_models_failed_at < OLLAMA_RETRY_SECONDS:
+                return True
+            try:
+                import ollama
+                listed = _field(ollama.Client().list(), "models", []) or []
+                _local_models = {_model_tag(_field(m, "model") or _field(m, "name") or "") for m in listed}
+            except Exception:
+                _local_models_failed_at = time.time()
+                return True  # Ollama not up yet; ask again after OLLAMA_RETRY_SECONDS
+    return not _local_models or _model_tag(model) in _local_models
+
+_fallback_warned = set()
+
+def resolve_route(node: str, config=None) -> dict:
+    """
+    MODEL_ROUTES[node] merged with this run's overrides from
+    config["configurable"]["models"][node]. A routed model that is not pulled
+    falls back to CHAT_MODEL, so the small-model defaults never break a setup
+    that only has the main model.
+    """
+    route = dict(MODEL_ROUTES.get(node, {"model": CHAT_MODEL, "temperature": 0}))
+    overrides = ((config or {}).get("configurable") or {}).get("models") or {}
+    route.update(overrides.get(node) or {})
+    if route["model"] != CHAT_MODEL and not _installed(route["model"]):
+        if route["model"] not in _fallback_warned:
+            _fallback_warned.add(route["model"])
+            print(f"[Models] {route['model']} is not pulled; using {CHAT_MODEL} instead "
+                  f"(ollama pull {route['model']} to enable it).")
+        route["model"] = CHAT_MODEL
+    return route
+
+def build_chat_model(model: str = CHAT_MODEL, **params):
+    """ChatOllama with the shared context window and keep-alive."""
+    from langchain_ollama import ChatOllama
+    from token_budget import MODEL_CONTEXT_TOKENS
+
+    params.setdefault("num_ctx", MODEL_CONTEXT_TOKENS)
+    return ChatOllama(model=model, keep_alive=OLLAMA_KEEP_ALIVE, **params)
+
+def routed_chat_models():
+    """Distinct chat models the routing table currently resolves to."""
+    return sorted({resolve_route(node)["model"] for node in MODEL_ROUTES})
+
+# --- Warm-up & Health ---
+
+_warmup_report = {}  # model -> {"load_seconds", "total_seconds", "warmed_at", "error"}
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+def _field(obj, name, default=None):
+    # The ollama client returns typed objects in newer releases and dicts in older ones.
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+def warm_up(models=None):
+    """
+    Loads every routed chat model and the embedding model into Ollama (one after
+    the other, so a small host is not asked to load them all at once) and pins
+    them with OLLAMA_KEEP_ALIVE.
+    Returns {model: report}.
+    """
+    import ollama
+
+    client = ollama.Client()
+    models = models or [("chat", m) for m in routed_chat_models()] + [("embed", EMBED_MODEL)]
+    for kind, model in models:
+        print(f"[Warm-up] Loading {model}...")
+        start = time.time()
+        try:
+            if kind == "chat":
+                response = client.generate(model=model, prompt="", keep_alive=OLLAMA_KEEP_ALIVE)
+            else:
+                response = client.embed(model=model, input="warm-up", keep_alive=OLLAMA_KEEP_ALIVE)
+            load_ns = _field(response, "load_duration") or 0
+            _warmup_report[model] = {
+                "load_seconds": round(load_ns / 1e9, 2),
+                "total_seconds": round(time.time() - start, 2),
+                "warmed_at": str(datetime.now()),
+                "error": None,
+            }
+            print(f"[Warm-up] {model} ready in {time.time() - start:.1f}s.")
+        except Exception as e:
+            _warmup_report[model] = {"load_seconds": None, "total_seconds": round(time.time() - start, 2),
+                                     "warmed_at": str(datetime.now()), "error": str(e)}
+            print(f"[Warm-up] {model} failed: {e}")
+    return dict(_warmup_report)
+
+def start_warm_up():
+    """Runs warm_up() once per process on a background thread, so startup is not blocked."""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up, name="ollama-warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+def health_check():
+    """
+    Reports whether Ollama is reachable and, per model, whether it is resident
+    in memory, until when, how large it is, and what the last warm-up cost.
+    """
+    import ollama
+
+    report = {"ollama": "down", "models": {}}
+    try:
+        loaded = _field(ollama.Client().ps(), "models", []) or []
+        report["ollama"] = "up"
+    except Exception as e:
+        report["error"] = str(e)
+        loaded = []
+
+    # Exact tags only: llama3.2:1b is not resident just because llama3.2:latest is.
+    resident = {_model_tag(_field(m, "model") or _field(m, "name") or ""): m for m in loaded}
+
+    for model in routed_chat_models() + [EMBED_MODEL]:
+        entry = resident.get(_model_tag(model))
+        report["models"][model] = {
+            "resident": entry is not None,
+            "expires_at": str(_field(entry, "expires_at")) if entry is not None else None,
+            "size_mb": round((_field(entry, "size") or 0) / 2**20) if entry is not None else None,
+            "vram_mb": round((_field(entry, "size_vram") or 0) / 2**20) if entry is not None else None,
+            "warm_up": _warmup_report.get(model),
+        }
+    return report
+
+# Test block
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps({node: resolve_route(node) for node in MODEL_ROUTES}, indent=2))
+    warm_up()
+    print(json.dumps(health_check(), indent=2))
@@ -1,10 +1,10 @@
 import sys
+import time
 import operator
 from typing import Literal
 
 # LangGraph Imports
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage
 
 # --- IMPORT FROM PHASE 3 ---
@@ -14,8 +14,11 @@ from agents import (
     researcher_node, 
     analyst_node, 
     writer_node, 
+    reviser_node, 
     llm_with_tools # We need the LLM for the routing decision
 )
+from checkpointer import get_checkpointer, clear_thread
+from blob_store import message_text
 
 # --- 1. Define New Phase 4 Logic (The Human Layer) ---
 
@@ -27,7 +30,7 @@ def human_approval_node(state: AgentState):
     # We don't modify the state here, just pass it through.
     return state
 
-def route_after_human(state: AgentState) -> Literal["Writer", "__end__"]:
+def route_after_human(state: AgentState) -> Literal["Reviser", "__end__"]:
     """
     Decides where to go based on what the human typed during the pause.
     """
@@ -38,8 +41,8 @@ def route_after_human(state: AgentState) -> Literal["Writer", "__end__"]:
         print("\n--- [System] Content Approved. Publishing... ---")
         return "__end__"
     else:
-        print("\n--- [System] Feedback received. Routing back to Writer... ---")
-        return "Writer"
+        print("\n--- [System] Feedback received. Routing to Reviser... ---")
+        return "Reviser"
 
 # --- 2. Build the Advanced Graph ---
 # We are reconstructing the graph but adding the new "Human" node.
@@ -51,8 +54,10 @@ workflow.add_node("Researcher", researcher_node)
 workflow.add_node("Analyst", analyst_node)
 workflow.add_node("Writer", writer_node)
 
-# Add the Phase 4 Node (New)
+# Add the Phase 4 Nodes (New)
 workflow.add_node("human_approval", human_approval_node)
+# Feedback patches only the affected sections instead of re-running the Writer
+workflow.add_node("Reviser", reviser_node)
 
 # --- 3. Define the Edges (The New Flow) ---
 workflow.set_entry_point("Researcher")
@@ -68,8 +73,12 @@ workflow.add_conditional_edges(
     route_after_human
 )
 
+# NEW: Every revision goes back to the human for another look
+workflow.add_edge("Reviser", "human_approval")
+
 # Compile with Memory (Required for pausing)
-memory = MemorySaver()
+# The SQLite checkpointer keeps paused reviews across restarts of this script.
+memory = get_checkpointer()
 app = workflow.compile(checkpointer=memory, interrupt_before=["human_approval"])
 
 # --- 4. The Interactive Execution Loop ---
@@ -79,18 +88,24 @@ if __name__ == "__main__":
     print("   NEWS NEXUS: HUMAN-IN-THE-LOOP MODE")
     print("===============================================")
     
-    user_topic = input("Enter a topic (e.g., 'AI trends in 2024'): ")
-    
     # Config keeps the session memory alive
     config = {"configurable": {"thread_id": "session_phase4"}}
-    inputs = {"messages": [HumanMessage(content=user_topic)], "research_data": []}
-    
-    print(f"\n[System] Starting Agents...")
     
-    # 1. Run until the "interrupt" (Human Approval Node)
-    # The graph will execute Researcher -> Analyst -> Writer -> PAUSE
-    for output in app.stream(inputs, config):
-        pass 
+    # A review paused in an earlier run is still waiting at the approval gate
+    paused = app.get_state(config)
+    if paused.next and input("A paused review was found. Resume it? [Y/n]: ").strip().lower() != "n":
+        print(f"\n[System] Resuming paused review...")
+    else:
+        clear_thread(config["configurable"]["thread_id"])
+        user_topic = input("Enter a topic (e.g., 'AI trends in 2024'): ")
+        inputs = {"messages": [HumanMessage(content=user_topic)], "research_data": []}
+        
+        print(f"\n[System] Starting Agents...")
+        
+        # 1. Run until the "interrupt" (Human Approval Node)
+        # The graph will execute Researcher -> Analyst -> Writer -> PAUSE
+        for output in app.stream(inputs, config):
+            pass 
     
     # 2. The Loop: Review -> Feedback -> Refine
     while True:
@@ -102,7 +117,7 @@ if __name__ == "__main__":
             print("Error: No state found.")
             break
             
-        current_draft = state.values['messages'][-1].content
+        current_draft = message_text(state.values['messages'][-1])
         
         print("\n" + "="*40)
         print("        CURRENT DRAFT FOR REVIEW")
@@ -125,7 +140,7 @@ if __name__ == "__main__":
             break
         else:
             # If feedback, we resume the graph. 
-            # The 'route_after_human' function will see the feedback and send it to 'Writer'
+            # The 'route_after_human' function will see the feedback and send it to 'Reviser'
             print(f"\n[System] Agents are revising based on feedback...")
             for output in app.stream(None, config):
                 pass
\ No newline at end of file
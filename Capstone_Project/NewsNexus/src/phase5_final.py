@@ -3,17 +3,19 @@ from typing import Literal
 
 # LangGraph Imports
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage, SystemMessage
 
 # Import our Memory Manager
 from memory_store import MemoryStore
+from checkpointer import get_checkpointer, clear_thread
+from blob_store import message_text
 
 # Import existing logic (Reusing your work!)
 from agents import (
     AgentState, 
     analyst_node, 
     writer_node, 
+    reviser_node, 
     llm_with_tools, 
     lookup_policy_docs, 
     web_search_stub,
@@ -90,12 +92,12 @@ def researcher_with_memory_node(state: AgentState):
 def human_approval_node(state: AgentState):
     return state
 
-def route_after_human(state: AgentState) -> Literal["Writer", "__end__"]:
+def route_after_human(state: AgentState) -> Literal["Reviser", "__end__"]:
     last_msg = state["messages"][-1].content.lower()
     if "approve" in last_msg:
         return "__end__"
     else:
-        return "Writer"
+        return "Reviser"
 
 # --- 3. Build the Final Graph ---
 
@@ -106,14 +108,17 @@ workflow.add_node("Researcher", researcher_with_memory_node)
 workflow.add_node("Analyst", analyst_node)
 workflow.add_node("Writer", writer_node)
 workflow.add_node("human_approval", human_approval_node)
+workflow.add_node("Reviser", reviser_node)
 
 workflow.set_entry_point("Researcher")
 workflow.add_edge("Researcher", "Analyst")
 workflow.add_edge("Analyst", "Writer")
 workflow.add_edge("Writer", "human_approval")
 workflow.add_conditional_edges("human_approval", route_after_human)
+workflow.add_edge("Reviser", "human_approval")
 
-memory = MemorySaver()
+# Durable checkpoints: a paused review survives restarts (see checkpointer.py)
+memory = get_checkpointer()
 app = workflow.compile(checkpointer=memory, interrupt_before=["human_approval"])
 
 # --- 4. Main Execution Loop ---
@@ -123,19 +128,26 @@ if __name__ == "__main__":
     print("   NEWS NEXUS FINAL: MEMORY & PERSISTENCE")
     print("===============================================")
     
-    # Ask for topic
-    user_topic = input("Enter topic: ")
-    
     config = {"configurable": {"thread_id": "final_session"}}
-    inputs = {"messages": [HumanMessage(content=user_topic)], "research_data": []}
     
-    # Run to Gate
-    for output in app.stream(inputs, config):
-        pass
+    # Resume a review left at the approval gate by an earlier run
+    paused = app.get_state(config)
+    if paused.next and input("A paused review was found. Resume it? [Y/n]: ").strip().lower() != "n":
+        user_topic = paused.values["messages"][0].content
+        print(f"[System] Resuming review of '{user_topic}'...")
+    else:
+        clear_thread(config["configurable"]["thread_id"])
+        # Ask for topic
+        user_topic = input("Enter topic: ")
+        inputs = {"messages": [HumanMessage(content=user_topic)], "research_data": []}
+        
+        # Run to Gate
+        for output in app.stream(inputs, config):
+            pass
     
     while True:
         state = app.get_state(config)
-        draft = state.values['messages'][-1].content
+        draft = message_text(state.values['messages'][-1])
         
         print("\n=== DRAFT ===\n" + draft + "\n=============\n")
         
@@ -0,0 +1,171 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
+from tracing import annotate, bind_context
+
+# --- Configuration ---
+# Per-call deadlines (seconds) for each research tool.
+WEB_DEADLINE = float(os.getenv("NEWSNEXUS_WEB_DEADLINE", 12))
+RSS_FEED_DEADLINE = float(os.getenv("NEWSNEXUS_RSS_FEED_DEADLINE", 8))
+RAG_DEADLINE = float(os.getenv("NEWSNEXUS_RAG_DEADLINE", 20))
+
+# A second web request is fired if the first has not answered after this many
+# seconds; whichever returns first wins. 0 disables hedging.
+WEB_HEDGE_DELAY = float(os.getenv("NEWSNEXUS_WEB_HEDGE_DELAY", 4))
+
+# Consecutive failures before an endpoint is skipped, and for how long.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("NEWSNEXUS_BREAKER_FAILURES", 3))
+BREAKER_COOLDOWN = float(os.getenv("NEWSNEXUS_BREAKER_COOLDOWN", 300))
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker for one endpoint.
+    closed -> open after BREAKER_FAILURE_THRESHOLD consecutive failures;
+    open -> half-open once the cool-down has passed (one trial call allowed);
+    half-open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"   > [Breaker] {self.name} recovered.")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+                print(f"   > [Breaker] {self.name} opened for {self.cooldown:.0f}s after {self.failures} failures.")
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+def breaker_report():
+    """Returns {endpoint: state} for every endpoint seen so far."""
+    with _breakers_lock:
+        return {name: b.state for name, b in _breakers.items()}
+
+# Calls run here so the caller can stop waiting at the deadline. A call that
+# overruns keeps its thread until the underlying I/O gives up, which is why
+# the clients are also given their own socket timeouts where they support one.
+# Callers with many slow endpoints (RSS feeds) pass their own `pool` so their
+# stragglers cannot starve web search and RAG lookups here.
+_call_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="tool-call")
+
+def _check_breaker(endpoint):
+    breaker = get_breaker(endpoint) if endpoint else None
+    if breaker and not breaker.allow():
+        raise CircuitOpenError(f"circuit open for {endpoint}, skipping")
+    return breaker
+
+def call_with_deadline(fn, *args, timeout, endpoint=None, pool=None, **kwargs):
+    """
+    Runs fn(*args, **kwargs) on `pool` (default: the shared tool pool),
+    raising DeadlineExceeded if it takes longer than `timeout`.
+    """
+    breaker = _check_breaker(endpoint)
+    future = (pool or _call_pool).submit(bind_context(fn), *args, **kwargs)
+    try:
+        result = future.result(timeout=timeout)
+    except FutureTimeout:
+        if breaker: breaker.record_failure()
+        raise DeadlineExceeded(f"{endpoint or fn.__name__} exceeded {timeout:.1f}s deadline")
+    except Exception:
+        if breaker: breaker.record_failure()
+        raise
+    if breaker: breaker.record_success()
+    return result
+
+def hedged_call(fn, *args, timeout, hedge_delay, endpoint=None, **kwargs):
+    """
+    Like call_with_deadline, but if the first attempt is still running after
+    `hedge_delay` seconds a second identical attempt is started, and the first
+    successful answer wins. The overall deadline still applies.
+    """
+    if not hedge_delay or hedge_delay >= timeout:
+        return call_with_deadline(fn, *args, timeout=timeout, endpoint=endpoint, **kwargs)
+
+    breaker = _check_breaker(endpoint)
+    deadline = time.time() + timeout
+    attempts = [_call_pool.submit(bind_context(fn), *args, **kwargs)]
+    done, _ = wait(attempts, timeout=hedge_delay)
+    if not done:
+        print(f"   > [Hedge] {endpoint or fn.__name__} slow after {hedge_delay:.1f}s, sending hedged request.")
+        annotate(hedged=True)
+        attempts.append(_call_pool.submit(bind_context(fn), *args, **kwargs))
+
+    pending = set(attempts)
+    last_error = None
+    while pending:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if breaker: breaker.record_success()
+                return future.result()
+            last_error = future.exception()
+
+    if breaker: breaker.record_failure()
+    if last_error is not None and not pending:
+        raise last_error
+    raise DeadlineExceeded(f"{endpoint or fn.__name__} exceeded {timeout:.1f}s deadline")
+
+# Test block
+if __name__ == "__main__":
+    def slow(seconds):
+        time.sleep(seconds)
+        return seconds
+
+    print(call_with_deadline(slow, 0.1, timeout=1, endpoint="demo"))
+    for _ in range(BREAKER_FAILURE_THRESHOLD + 1):
+        try:
+            call_with_deadline(slow, 2, timeout=0.2, endpoint="demo")
+        except (DeadlineExceeded, CircuitOpenError) as e:
+            print(f"{type(e).__name__}: {e}")
+    print(breaker_report())
@@ -4,8 +4,6 @@ import os
 # Add the project root to the system path to allow imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from langchain_chroma import Chroma
-
 # --- Configuration ---
 DB_PATH = r"D:\NIE_GENai\Capstone_Project\NewsNexus\data\chroma_db"
 
@@ -15,9 +13,12 @@ def retrieve_documents(query, k=4, keyword_filter=True):
     a simple keyword boosting filter (Hybrid Search Logic).
     """
     
-    # 1. Initialize the Embedding Model (Switched to Ollama for stability)
-    from langchain_ollama import OllamaEmbeddings
-    embedding_model = OllamaEmbeddings(model="nomic-embed-text")
+    # Imported here so importing the tools (and the app) does not load Chroma up front
+    from langchain_chroma import Chroma
+
+    # 1. Initialize the Embedding Model (Switched to Ollama for stability; shared & kept warm)
+    from ollama_models import get_embeddings
+    embedding_model = get_embeddings()
     
     # 2. Connect to the existing Vector Store
     vector_store = Chroma(
@@ -0,0 +1,155 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from tracing import bind_context
+
+# --- Configuration ---
+# Sections rewritten at once during a revision (same slots as the section-parallel Writer).
+REVISION_WORKERS = int(os.getenv("NEWSNEXUS_WRITER_PARALLELISM", os.getenv("OLLAMA_NUM_PARALLEL", 4)))
+PREVIEW_CHARS = 200  # how much of each part the selector sees
+
+SELECT_PROMPT = """You are the editor of a technology newsletter. A reviewer left feedback on the draft.
+The draft is split into numbered parts:
+
+{parts}
+
+FEEDBACK: {feedback}
+
+Which parts must change to address the feedback? Reply with the part numbers only, comma-separated (e.g. 2 or 1,3).
+Reply ALL only if the feedback applies to the whole newsletter (overall tone, length or style).
+"""
+
+REVISE_PROMPT = """You are an elite technology newsletter editor revising one part of an HTML newsletter.
+Apply the reviewer's feedback to this part only. Keep its HTML structure, headings and every <a> link unless the feedback says otherwise.
+DO NOT wrap the output in markdown code blocks (e.g. ```html), ONLY return the revised raw HTML of this part.
+
+FEEDBACK: {feedback}
+
+CURRENT PART:
+{html}
+"""
+
+_SECTION_RE = re.compile(r"<section\b.*?</section>", re.S | re.I)
+_H1_RE = re.compile(r"<h1\b", re.I)
+_H2_RE = re.compile(r"<h2\b", re.I)
+_CLOSING_RE = re.compile(r"</(?:article|body|html)>", re.I)
+_HEADING_RE = re.compile(r"<h[1-3]\b[^>]*>(.*?)</h[1-3]>", re.S | re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+def _text(html: str) -> str:
+    return " ".join(_TAG_RE.sub(" ", html).split())
+
+def split_draft(html: str):
+    """
+    Splits a newsletter into parts: [{"heading", "html", "editable"}].
+    Joining every part's html gives back the draft exactly. Drafts from the
+    section-parallel Writer split on <section>; single-pass drafts split
+    before each <h2>. The headline and wrapper tags (<article>, </body>, ...)
+    are split off too; markup without visible text is not editable.
+    """
+    sections = list(_SECTION_RE.finditer(html))
+    if sections:
+        cuts = [m.start() for m in sections] + [m.end() for m in sections]
+    else:
+        cuts = [m.start() for m in _H2_RE.finditer(html)]
+    for pattern in (_H1_RE, _CLOSING_RE):
+        match = pattern.search(html)
+        if match:
+            cuts.append(match.start())
+    cuts = sorted(set([0, len(html)] + cuts))
+
+    parts = []
+    for start, end in zip(cuts, cuts[1:]):
+        chunk = html[start:end]
+        heading = _HEADING_RE.search(chunk)
+        text = _text(chunk)
+        parts.append({
+            "heading": _text(heading.group(1)) if heading else text[:60],
+            "html": chunk,
+            "editable": bool(text),
+        })
+    return parts
+
+def strip_code_fences(html: str) -> str:
+    html = html.strip()
+    if html.startswith("```"):
+        html = html.split("\n", 1)[1] if "\n" in html else ""
+    if html.endswith("```"):
+        html = html[:-3]
+    return html.strip()
+
+def select_parts(llm, parts, feedback: str):
+    """Asks the model which editable parts the feedback touches. Returns (indexes, prompt, response)."""
+    editable = [i for i, p in enumerate(parts) if p["editable"]]
+    listing = "\n\n".join(
+        f"[{n}] {parts[i]['heading']}\n{_text(parts[i]['html'])[:PREVIEW_CHARS]}" for n, i in enumerate(editable, 1)
+    )
+    prompt = SELECT_PROMPT.format(parts=listing, feedback=feedback)
+    response = llm.invoke(prompt)
+    answer = response.content.strip()
+    numbers = {int(n) for n in re.findall(r"\d+", answer)}
+    chosen = [i for n, i in enumerate(editable, 1) if n in numbers]
+    # Only the literal reply ALL means every part: "2, not all sections need changes" is part 2.
+    if answer.rstrip(".") == "ALL" or not chosen:
+        # Unparseable answers are treated as global feedback rather than ignored.
+        chosen = editable
+    return chosen, prompt, response
+
+def revise_draft(llm, draft: str, feedback: str, generate=None, workers=REVISION_WORKERS):
+    """
+    Patch-style revision: picks the parts the feedback affects, rewrites only
+    those (in parallel) and splices them back into the draft.
+    `generate(prompt, index)` produces one revised part; it defaults to
+    llm.invoke and lets callers stream instead.
+    Returns (revised html, calls, stats); calls are (role, prompt, response)
+    triples for token accounting, role being "revision_selector" for the
+    part-selection call and "reviser" for each rewritten part.
+    """
+    generate = generate or (lambda prompt, index: llm.invoke(prompt))
+    parts = split_draft(draft)
+    editable = [i for i, p in enumerate(parts) if p["editable"]]
+    calls = []
+
+    if len(editable) > 1:
+        chosen, prompt, response = select_parts(llm, parts, feedback)
+        calls.append(("revision_selector", prompt, response))
+    else:
+        chosen = editable
+
+    print(f"   > [Revision] Rewriting {len(chosen)} of {len(editable)} parts: "
+          f"{', '.join(parts[i]['heading'] for i in chosen)}")
+    prompts = {i: REVISE_PROMPT.format(feedback=feedback, html=parts[i]["html"]) for i in chosen}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chosen) or 1)), thread_name_prefix="revise") as executor:
+        responses = dict(zip(chosen, executor.map(bind_context(lambda i: generate(prompts[i], i)), chosen)))
+
+    for i, response in responses.items():
+        calls.append(("reviser", prompts[i], response))
+        revised = strip_code_fences(response.content)
+        if revised:
+            # Keep the whitespace that separated this part from its neighbours.
+            original = parts[i]["html"]
+            lead = original[:len(original) - len(original.lstrip())]
+            trail = original[len(original.rstrip()):]
+            parts[i]["html"] = f"{lead}{revised}{trail}"
+
+    stats = {"parts_total": len(editable), "parts_revised": len(chosen)}
+    return "".join(p["html"] for p in parts), calls, stats
+
+# Test block
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    class Editor:
+        """Stand-in model: picks part 2 and upper-cases whatever it is asked to revise."""
+        def invoke(self, prompt):
+            if prompt.startswith("You are the editor"):
+                return SimpleNamespace(content="2")
+            return SimpleNamespace(content=prompt.split("CURRENT PART:\n", 1)[1].upper())
+
+    draft = ("<article>\n<h1>AI Weekly</h1>\n<section>\n<h2>Overview</h2><p>Long intro.</p>\n</section>\n\n"
+             "<section>\n<h2>Outlook</h2><p>More.</p>\n</section>\n</article>")
+    for part in split_draft(draft):
+        print(part["editable"], repr(part["heading"]))
+    revised, calls, stats = revise_draft(Editor(), draft, "shorten the intro")
+    print(stats)
+    print(revised)
@@ -0,0 +1,185 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # src/
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+RSS_INDEX_PATH = os.path.join(PROJECT_ROOT, "data", "rss_index", "entries.sqlite")
+
+POLL_INTERVAL = int(os.getenv("NEWSNEXUS_RSS_POLL_INTERVAL", 5 * 60))  # seconds between poller passes
+RSS_LOOKBACK_DAYS = int(os.getenv("NEWSNEXUS_RSS_LOOKBACK_DAYS", 30))   # how far back searches reach
+RECENCY_HALF_LIFE_DAYS = 7.0  # an entry this old keeps half of its recency boost
+CANDIDATE_POOL = 100          # FTS matches re-ranked by recency
+
+class RSSIndex:
+    """
+    Persistent store of every RSS entry the poller has seen.
+    Entries are deduplicated by link and full-text indexed (SQLite FTS5),
+    so searches cover weeks of history instead of the last 10 items per feed.
+    """
+
+    def __init__(self, path=RSS_INDEX_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    link TEXT UNIQUE NOT NULL,
+                    feed TEXT,
+                    title TEXT,
+                    summary TEXT,
+                    published REAL,
+                    first_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_published ON entries(published);
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    title, summary, content='entries', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+                    INSERT INTO entries_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+                    INSERT INTO entries_fts(entries_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+                    INSERT INTO entries_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+                END;
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add_entries(self, entries) -> int:
+        """Upserts entries (dicts from feeds.FeedCache) by link. Returns the number of new links."""
+        now = time.time()
+        rows = [
+            (e["link"], e["feed"], e["title"], e["summary"], e["published"], now)
+            for e in entries if e.get("link")
+        ]
+        with self._write_lock, self._connect() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            conn.executemany(
+                """INSERT INTO entries (link, feed, title, summary, published, first_seen)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(link) DO UPDATE SET
+                       title = excluded.title,
+                       summary = excluded.summary,
+                       published = COALESCE(excluded.published, entries.published)
+                   WHERE entries.title IS NOT excluded.title OR entries.summary IS NOT excluded.summary""",
+                rows,
+            )
+            after = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return after - before
+
+    def search(self, query: str, limit=10, max_age_days=RSS_LOOKBACK_DAYS):
+        """
+        Returns up to `limit` entries matching ANY query keyword, ranked by
+        BM25 relevance weighted with an exponential recency decay.
+        """
+        keywords = re.findall(r"\w+", query.lower())
+        if not keywords:
+            return []
+        match = " OR ".join(f'"{kw}"' for kw in dict.fromkeys(keywords))
+        now = time.time()
+        cutoff = now - max_age_days * 86400
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                """SELECT e.feed, e.title, e.link, e.summary, COALESCE(e.published, e.first_seen) AS ts,
+                          bm25(entries_fts) AS rank
+                   FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid
+                   WHERE entries_fts MATCH ? AND COALESCE(e.published, e.first_seen) >= ?
+                   ORDER BY rank LIMIT ?""",
+                (match, cutoff, CANDIDATE_POOL),
+            ).fetchall()
+
+        # bm25() is negative, more negative = more relevant. Normalise against the
+        # best candidate so the recency weighting behaves the same on any corpus size.
+        best = max((-row[5] for row in rows), default=0.0)
+        results = []
+        for feed, title, link, summary, ts, rank in rows:
+            relevance = (-rank / best) if best > 0 else 1.0
+            age_days = max(now - ts, 0) / 86400
+            recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+            score = relevance * (0.5 + 0.5 * recency)
+            results.append({"feed": feed, "title": title, "link": link, "summary": summary,
+                            "published": ts, "score": score})
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:limit]
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+# --- Background Poller ---
+
+_index = None
+_poller = None
+_poller_lock = threading.Lock()
+_first_poll = threading.Event()  # set once the poller has finished its first pass
+
+def get_rss_index() -> RSSIndex:
+    global _index
+    with _poller_lock:
+        if _index is None:
+            _index = RSSIndex()
+        return _index
+
+def poll_once() -> int:
+    """Refreshes due feeds and indexes every entry they currently list."""
+    from feeds import get_feed_cache
+
+    cache = get_feed_cache()
+    cache.refresh()
+    entries = [e for _, feed_entries in cache.snapshot(refresh=False) for e in feed_entries]
+    added = get_rss_index().add_entries(entries)
+    if added:
+        print(f"   > [RSS Index] Indexed {added} new entries.")
+    return added
+
+def _poll_forever(interval):
+    while True:
+        try:
+            poll_once()
+        except Exception as e:
+            print(f"   > [RSS Index] Poll failed: {e}")
+        _first_poll.set()
+        time.sleep(interval)
+
+def start_poller(interval=POLL_INTERVAL):
+    """Starts the background poller once per process (daemon thread)."""
+    global _poller
+    with _poller_lock:
+        if _poller is None or not _poller.is_alive():
+            _poller = threading.Thread(target=_poll_forever, args=(interval,), name="rss-poller", daemon=True)
+            _poller.start()
+    return _poller
+
+def wait_for_first_poll(timeout) -> bool:
+    """Blocks until the poller's first pass is done or `timeout` seconds pass; True if it finished."""
+    return _first_poll.wait(timeout)
+
+# Test block
+if __name__ == "__main__":
+    start = time.time()
+    print(f"Polled feeds, {poll_once()} new entries ({time.time() - start:.2f}s)")
+    index = get_rss_index()
+    print(f"Index holds {len(index)} entries.")
+    start = time.time()
+    hits = index.search("AI security model")
+    print(f"Search took {(time.time() - start) * 1000:.1f} ms")
+    for hit in hits:
+        print(f" - [{hit['score']:.2f}] {hit['title']} ({hit['feed']})")
@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 import time
+import uuid
 import sys
 
 # --- GLOBAL ERROR CATCHER ---
@@ -34,7 +35,7 @@ if "research_data" not in st.session_state: st.session_state.research_data = []
 if "chart_data" not in st.session_state: st.session_state.chart_data = []
 if "draft_content" not in st.session_state: st.session_state.draft_content = ""
 if "current_step" not in st.session_state: st.session_state.current_step = "idle" 
-if "thread_id" not in st.session_state: st.session_state.thread_id = f"session_{int(time.time())}"
+if "thread_id" not in st.session_state: st.session_state.thread_id = f"session_{uuid.uuid4().hex}"
 if "topic" not in st.session_state: st.session_state.topic = ""
 
 # --- Helper Functions ---
@@ -85,6 +86,8 @@ topic_input = st.text_input("Enter Topic:", placeholder="e.g. AI trends in 2024"
 if st.button("🚀 Start Agents", disabled=st.session_state.current_step != "idle") and topic_input:
     st.session_state.topic = topic_input
     st.session_state.current_step = "researching"
+    # Checkpoints persist across runs now, so each run needs its own thread
+    st.session_state.thread_id = f"session_{uuid.uuid4().hex}"
     st.rerun()
 
 # --- LOGIC: RESEARCHING ---
@@ -107,6 +110,7 @@ if st.session_state.current_step == "researching":
         from agents import app as agent_app
         from langchain_core.messages import HumanMessage
         from memory_store import MemoryStore
+        from blob_store import resolve, message_text
 
         # Memory Check
         try:
@@ -124,7 +128,7 @@ if st.session_state.current_step == "researching":
         for event in agent_app.stream(inputs, config):
             
             if "Researcher" in event:
-                data = event["Researcher"].get("research_data", [])
+                data = [resolve(item) for item in event["Researcher"].get("research_data", [])]
                 st.session_state.research_data = data
                 r_container.success(f"Found {len(data)} facts")
                 with r_container.expander("Details"):
@@ -137,7 +141,7 @@ if st.session_state.current_step == "researching":
                 a_container.success("Analysis Complete")
                 
             if "Writer" in event:
-                content = event["Writer"]["messages"][-1].content
+                content = message_text(event["Writer"]["messages"][-1])
                 st.session_state.draft_content = content
                 w_container.success("Draft Written")
         
@@ -162,19 +166,17 @@ if st.session_state.current_step == "reviewing":
     
     if st.button("Submit Decision"):
         try:
-            from agents import app as agent_app
-            from langchain_core.messages import HumanMessage
+            from agents import revise_newsletter, record_revision
             from memory_store import MemoryStore
             
             config = {"configurable": {"thread_id": st.session_state.thread_id}}
             
             if feedback:
                 with st.spinner("Revising..."):
-                    agent_app.update_state(config, {"messages": [HumanMessage(content=feedback)]})
-                    for event in agent_app.stream(None, config): pass
-                    
-                    state = agent_app.get_state(config)
-                    st.session_state.draft_content = state.values['messages'][-1].content
+                    # Only the sections the feedback affects are rewritten
+                    revised, _, _ = revise_newsletter(st.session_state.draft_content, feedback)
+                    record_revision(config, feedback, revised)
+                    st.session_state.draft_content = revised
                     st.success("Revised!")
                     time.sleep(1)
                     st.rerun()
@@ -0,0 +1,107 @@
+import os
+import threading
+
+# --- Configuration ---
+# Context window we ask Ollama for; prompts are budgeted to leave room for the answer.
+MODEL_CONTEXT_TOKENS = int(os.getenv("NEWSNEXUS_NUM_CTX", 8192))
+
+# Max prompt tokens per node. Content over budget is trimmed lowest-priority first.
+NODE_TOKEN_BUDGETS = {
+    "planner": 1024,
+    "analyst": int(os.getenv("NEWSNEXUS_ANALYST_TOKEN_BUDGET", 6144)),
+    "writer": int(os.getenv("NEWSNEXUS_WRITER_TOKEN_BUDGET", 4096)),
+}
+
+# tiktoken's cl100k_base is not llama3.2's tokenizer, but it tracks it closely
+# enough for budgeting. Without tiktoken (or its encoding file) we fall back to ~4 chars/token.
+TOKEN_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                print(f"   > [Tokens] tiktoken unavailable ({e}); estimating {CHARS_PER_TOKEN} chars/token.")
+                _encoding = False
+        return _encoding
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+MIN_PARTIAL_TOKENS = 64  # a truncated section shorter than this is dropped instead
+
+def fit_to_budget(sections, budget: int):
+    """
+    sections: list of (priority, text); higher priority is kept longer.
+    Trims lowest-priority sections first until the rest fits `budget` tokens.
+    The section that crosses the line is cut down to the remaining room rather
+    than dropped outright. Returns (kept texts in original order, number of
+    sections trimmed or dropped).
+    """
+    sizes = [count_tokens(text) for _, text in sections]
+    total = sum(sizes)
+    if total <= budget:
+        return [text for _, text in sections], 0
+
+    texts = {i: text for i, (_, text) in enumerate(sections)}
+    trimmed = 0
+    # Among equal priorities the later section goes first.
+    for index in sorted(range(len(sections)), key=lambda i: (sections[i][0], -i)):
+        if total <= budget:
+            break
+        trimmed += 1
+        room = budget - (total - sizes[index])
+        if room >= MIN_PARTIAL_TOKENS or len(texts) == 1:
+            texts[index] = truncate_to_tokens(texts[index], room)
+            total = budget
+        else:
+            del texts[index]
+            total -= sizes[index]
+    return [texts[i] for i in sorted(texts) if texts[i]], trimmed
+
+def usage_record(node: str, prompt: str, response, budget: int = None, trimmed: int = 0) -> dict:
+    """
+    One AgentState.token_usage entry. Uses the model's own counts when it reports
+    them. An answer served by the response cache (see llm_cache.py) cost no
+    generation, so it is recorded as zero tokens with cached=True.
+    """
+    if (getattr(response, "response_metadata", None) or {}).get("cache_hit"):
+        return {"node": node, "prompt_tokens": 0, "completion_tokens": 0,
+                "budget": budget, "sections_trimmed": trimmed, "cached": True}
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "node": node,
+        "prompt_tokens": usage.get("input_tokens") or count_tokens(prompt),
+        "completion_tokens": usage.get("output_tokens") or count_tokens(getattr(response, "content", "")),
+        "budget": budget,
+        "sections_trimmed": trimmed,
+        "cached": False,
+    }
+
+# Test block
+if __name__ == "__main__":
+    sections = [(10, "internal report " * 50), (5, "first query " * 200), (1, "third query " * 200)]
+    texts, trimmed = fit_to_budget(sections, budget=500)
+    print(f"Kept {len(texts)} of {len(sections)} sections ({trimmed} trimmed), "
+          f"{sum(count_tokens(t) for t in texts)} tokens")
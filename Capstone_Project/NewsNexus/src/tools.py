@@ -1,43 +1,111 @@
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from langchain.tools import tool
-from langchain_ollama import ChatOllama
 from retrieval import retrieve_documents
+from cache_store import DiskCache, CACHE_DIR
+from findings import make_finding, format_finding
+from cassette import cassette
+from ollama_models import CHAT_MODEL, build_chat_model
+from resilience import call_with_deadline, hedged_call, WEB_DEADLINE, WEB_HEDGE_DELAY, RAG_DEADLINE, RSS_FEED_DEADLINE
+from tracing import annotate, traced_tool
 
-# --- Tool 1: The RAG Tool (Enhanced with Deep Links) ---
-@tool
-def lookup_policy_docs(query: str) -> str:
-    """
-    Useful for finding specific details, statistics, or sections from the uploaded 
-    industry reports (PDFs). Use this when you need factual grounding.
-    """
+# --- Web Search Cache Configuration ---
+# Results younger than SEARCH_CACHE_TTL are served straight from disk.
+# Older results (up to SEARCH_CACHE_STALE_TTL) are still served instantly,
+# while a background refresh fetches a fresh copy (stale-while-revalidate).
+SEARCH_CACHE_TTL = int(os.getenv("NEWSNEXUS_SEARCH_TTL", 6 * 3600))
+SEARCH_CACHE_STALE_TTL = int(os.getenv("NEWSNEXUS_SEARCH_STALE_TTL", 7 * 24 * 3600))
+SEARCH_MAX_RESULTS = 10
+# Empty result lists are never cached: DuckDuckGo answers a rate-limited request with
+# nothing, and caching that would blank the query for SEARCH_CACHE_TTL.
+
+_search_cache = DiskCache(os.path.join(CACHE_DIR, "web_search.sqlite"))
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _ddg_fetch(search_type: str, query: str) -> list:
+    """Runs one live DuckDuckGo query. search_type is 'text' or 'news'."""
+    from duckduckgo_search import DDGS
+    with DDGS(timeout=int(WEB_DEADLINE)) as ddgs:
+        search = ddgs.text if search_type == "text" else ddgs.news
+        return list(search(query, max_results=SEARCH_MAX_RESULTS))
+
+def _background_refresh(search_type: str, query: str, key: str):
+    try:
+        results = call_with_deadline(_ddg_fetch, search_type, query, timeout=WEB_DEADLINE, endpoint="duckduckgo")
+        if not results:
+            print(f"   > [Cache] Refresh for '{query}' came back empty; keeping the stale copy")
+            return
+        _search_cache.set(key, results)
+        print(f"   > [Cache] Refreshed {search_type} results for '{query}'")
+    except Exception as e:
+        print(f"   > [Cache] Background refresh failed for '{query}': {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def cached_ddg_search(search_type: str, query: str) -> list:
+    """DuckDuckGo search through the persistent result cache."""
+    key = f"{search_type}:{_normalize_query(query)}"
+    hit = _search_cache.get(key)
+    if hit is not None and hit[0]:  # empty entries (written before they were skipped) count as a miss
+        results, age = hit
+        if age < SEARCH_CACHE_TTL:
+            print(f"   > [Cache] Fresh hit for {search_type} '{query}'")
+            annotate(**{f"cache_{search_type}": "fresh"})
+            return results
+        if age < SEARCH_CACHE_STALE_TTL:
+            print(f"   > [Cache] Stale hit for {search_type} '{query}', revalidating in background")
+            with _refreshing_lock:
+                if key not in _refreshing:
+                    _refreshing.add(key)
+                    _refresh_pool.submit(_background_refresh, search_type, query, key)
+            annotate(**{f"cache_{search_type}": "stale"})
+            return results
+
+    # Bounded by WEB_DEADLINE, skipped while the DuckDuckGo breaker is open,
+    # and hedged with a second request if the first one is slow.
+    results = hedged_call(_ddg_fetch, search_type, query, timeout=WEB_DEADLINE,
+                          hedge_delay=WEB_HEDGE_DELAY, endpoint="duckduckgo")
+    if results:
+        _search_cache.set(key, results)
+    annotate(**{f"cache_{search_type}": "miss"})
+    return results
+
+# --- Structured Record Functions ---
+# Each tool has a record function returning findings (see findings.py) so the
+# Researcher can deduplicate across queries; the @tool wrappers below render
+# the same records as text for direct LLM tool use. Record functions are
+# wrapped by @cassette so runs can be recorded and replayed offline, and by
+# @traced_tool so each call (replayed or live) is a span in the run's trace.
+
+@traced_tool("rag")
+@cassette("rag")
+def policy_doc_records(query: str) -> list:
     # Clean the query if it comes in as a dictionary string
     if isinstance(query, str) and "{" in query:
         query = query.replace("{", "").replace("}", "").replace("value:", "")
-        
-    docs = retrieve_documents(query, k=3)
-    if not docs:
-        return f"RAG: No relevant internal documents found for query: '{query}'."
-        
-    results = []
+
+    docs = call_with_deadline(retrieve_documents, query, k=3, timeout=RAG_DEADLINE, endpoint="chroma")
+    records = []
     for doc, score in docs:
         source_name = doc.metadata.get('source', 'Unknown PDF')
         basename = os.path.basename(source_name)
         safe_source_path = source_name.replace('\\', '/')
-        results.append(f"Content: {doc.page_content}\nSource Link: [{basename}](file:///{safe_source_path})")
-    
-    return "\n\n".join(results)
+        records.append(make_finding(f"file:///{safe_source_path}", basename, doc.page_content, "rag", query))
+    return records
 
-# --- Tool 2: The Live Web Search Tool (Enhanced with Citations) ---
-@tool
-def web_search_stub(query: str) -> str:
-    """
-    Useful for finding the 'latest' or 'current' news from the internet.
-    Use this for recent trends, real-time events, or any information not in the PDFs.
-    """
-    from duckduckgo_search import DDGS
+@traced_tool("web")
+@cassette("web")
+def web_search_records(query: str) -> list:
     import re
-    
+
     clean_query = str(query)
     if "{" in clean_query:
         match = re.search(r'["\']query["\']:\s*["\']([^"\']+)["\']', clean_query)
@@ -47,69 +115,94 @@ def web_search_stub(query: str) -> str:
             clean_query = clean_query.replace("{", "").replace("}", "").replace("value:", "").strip()
 
     print(f"\n[Tool Called] Live Web Search for: '{clean_query}'")
+
+    # Try text search first
+    results = cached_ddg_search("text", clean_query)
+
+    # If empty, try a news search as fallback
+    if not results:
+        print("   > No text results, trying news search...")
+        results = cached_ddg_search("news", clean_query)
+
+    return [
+        make_finding(
+            res.get("href", res.get("url", "#")),
+            res.get("title", "Source"),
+            res.get("body", res.get("snippet", "No Snippet")),
+            "web",
+            query,
+        )
+        for res in results
+    ]
+
+RSS_MAX_RESULTS = 10
+
+@traced_tool("rss")
+@cassette("rss")
+def rss_records(query: str) -> list:
+    from rss_index import get_rss_index, start_poller, wait_for_first_poll
+
+    print(f"\n[Tool Called] RSS Search for: '{query}'")
+
+    # The background poller keeps every entry it has seen in a local full-text
+    # index; a search is just an indexed lookup ranked by relevance and recency.
+    index = get_rss_index()
+    start_poller()
+    if len(index) == 0:
+        # First run on this host: give the poller's first pass (feeds are fetched in
+        # parallel, each cut off at RSS_FEED_DEADLINE) that long to fill the index,
+        # rather than polling again here. Whatever is indexed by then is searched.
+        wait_for_first_poll(RSS_FEED_DEADLINE)
+
+    return [
+        make_finding(entry["link"], entry["title"], entry["summary"], "rss", query, entry["feed"])
+        for entry in index.search(query, limit=RSS_MAX_RESULTS)
+    ]
+
+# --- Tool 1: The RAG Tool (Enhanced with Deep Links) ---
+@tool
+def lookup_policy_docs(query: str) -> str:
+    """
+    Useful for finding specific details, statistics, or sections from the uploaded 
+    industry reports (PDFs). Use this when you need factual grounding.
+    """
+    try:
+        records = policy_doc_records(query)
+    except Exception as e:
+        return f"RAG: Error during lookup: {e}"
+    if not records:
+        return f"RAG: No relevant internal documents found for query: '{query}'."
     
+    return "\n\n".join(format_finding(r) for r in records)
+
+# --- Tool 2: The Live Web Search Tool (Enhanced with Citations) ---
+@tool
+def web_search_stub(query: str) -> str:
+    """
+    Useful for finding the 'latest' or 'current' news from the internet.
+    Use this for recent trends, real-time events, or any information not in the PDFs.
+    """
     try:
-        from duckduckgo_search import DDGS
-        with DDGS() as ddgs:
-            # Try text search first
-            results = list(ddgs.text(clean_query, max_results=10))
-            
-            # If empty, try a news search as fallback
-            if not results:
-                print("   > No text results, trying news search...")
-                results = list(ddgs.news(clean_query, max_results=10))
-                
-            if results:
-                formatted_results = []
-                for res in results:
-                    title = res.get("title", "Source")
-                    link = res.get("href", res.get("url", "#"))
-                    snippet = res.get("body", res.get("snippet", "No Snippet"))
-                    formatted_results.append(f"Title: {title}\nLink: [{title}]({link})\nSnippet: {snippet}")
-                return "\n\n---\n".join(formatted_results)
-            else:
-                return f"WEB: DuckDuckGo returned 0 results for query: '{clean_query}'."
+        records = web_search_records(query)
     except Exception as e:
         return f"WEB: Error during search: {e}"
-        
-    return "WEB: Unexpected failure in web search tool."
+    if not records:
+        return f"WEB: DuckDuckGo returned 0 results for query: '{query}'."
+    
+    return "\n\n---\n".join(format_finding(r) for r in records)
 
-# --- Tool 3: RSS Feed Connector (Enhanced) ---
+# --- Tool 3: RSS Feed Connector (Indexed) ---
 @tool
 def rss_feed_search(query: str) -> str:
     """
     Useful for finding high-quality, targeted news from specific industry RSS feeds.
     """
-    import feedparser
-    
-    FEEDS = [
-        "https://www.technologyreview.com/feed/",
-        "https://openai.com/news/rss.xml",
-        "https://machinelearning.apple.com/rss.xml",
-        "https://feeds.feedburner.com/TheHackersNews",
-        "https://techcrunch.com/feed/"
-    ]
-    
-    results = []
-    # Broaden keyword search
-    keywords = query.lower().split()
-    print(f"\n[Tool Called] RSS Search for keywords: {keywords}")
+    records = rss_records(query)
     
-    for url in FEEDS:
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:10]:
-                text_to_search = (entry.title + " " + entry.get("summary", "")).lower()
-                # Match if ANY keyword exists (Hybrid match)
-                if any(kw in text_to_search for kw in keywords):
-                    results.append(f"Source: {feed.feed.get('title', 'Industry News')}\nTitle: {entry.title}\nLink: [{entry.title}]({entry.link})\nSummary: {entry.get('summary', '')[:250]}...")
-        except Exception as e:
-            continue
-            
-    return "\n\n---\n".join(results) if results else "No matching recent RSS entries found."
+    return "\n\n---\n".join(format_finding(r) for r in records) if records else "No matching recent RSS entries found."
 
 def get_llm_with_tools():
-    llm = ChatOllama(model="llama3.2", temperature=0) 
+    llm = build_chat_model(CHAT_MODEL, temperature=0)
     tools = [lookup_policy_docs, web_search_stub, rss_feed_search]
     llm_with_tools = llm.bind_tools(tools)
     return llm, llm_with_tools, tools
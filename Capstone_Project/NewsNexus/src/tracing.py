@@ -0,0 +1,336 @@
+import os
+import json
+import time
+import uuid
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import datetime, timedelta
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.join(BASE_DIR, "..")
+TRACE_DIR = os.getenv("NEWSNEXUS_TRACE_DIR", os.path.join(PROJECT_ROOT, "data", "traces"))
+TRACING_ENABLED = os.getenv("NEWSNEXUS_TRACING", "1") != "0"
+TRACE_KEEP_DAYS = int(os.getenv("NEWSNEXUS_TRACE_KEEP_DAYS", 7))  # daily span files older than this are deleted
+TRACES_IN_MEMORY = 20  # recent traces kept in memory for the UI; older ones are read back from disk
+
+# A trace is one session: its id is the graph's thread_id, so the pipeline run and
+# every later revision of the same newsletter land on one timeline.
+_trace_id = ContextVar("newsnexus_trace_id", default=None)
+_current_span = ContextVar("newsnexus_span", default=None)
+
+_recent = OrderedDict()  # trace_id -> [span dicts]
+_recent_lock = threading.Lock()
+_file_lock = threading.Lock()
+_pruned_for = None
+
+class Span:
+    """One timed operation: a graph node, tool call, embedding call or LLM call."""
+
+    def __init__(self, trace_id, name, kind, parent_id=None, attrs=None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attrs = {k: v for k, v in (attrs or {}).items() if v is not None}
+        self.status = "ok"
+        self.error = None
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms = None
+
+    def set(self, **attrs):
+        self.attrs.update({k: v for k, v in attrs.items() if v is not None})
+
+    def add(self, **counts):
+        """Accumulates numeric attributes, e.g. payload sizes over several chunks."""
+        for k, v in counts.items():
+            self.attrs[k] = self.attrs.get(k, 0) + v
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 2)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 4),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+class _NoSpan:
+    """Returned outside a trace (or with tracing off) so callers never need to check."""
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, **counts):
+        pass
+
+NO_SPAN = _NoSpan()
+
+def trace_id_from(config):
+    """The trace for a LangGraph config: its thread_id, if any."""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+def current_span():
+    return _current_span.get() or NO_SPAN
+
+def annotate(**attrs):
+    """Adds attributes to the innermost open span (e.g. a cache outcome deep inside a tool)."""
+    current_span().set(**attrs)
+
+@contextmanager
+def span(name, kind="internal", trace_id=None, leaf=False, **attrs):
+    """
+    Times the enclosed block as a child of the current span. Outside a trace
+    (no `trace_id` given and none active) nothing is recorded.
+    `leaf=True` spans never become the current span, which keeps a span held
+    open across a generator's yields from adopting the consumer's work.
+    """
+    trace_id = trace_id or _trace_id.get()
+    if not TRACING_ENABLED or trace_id is None:
+        yield NO_SPAN
+        return
+
+    parent = _current_span.get()
+    parent_id = parent.span_id if parent is not None and parent.trace_id == trace_id else None
+    s = Span(trace_id, name, kind, parent_id, attrs)
+    tokens = None if leaf else (_trace_id.set(trace_id), _current_span.set(s))
+    try:
+        yield s
+    except GeneratorExit:
+        s.status = "cancelled"  # a stream the consumer stopped reading
+        raise
+    except BaseException as e:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        s.finish()
+        if tokens is not None:
+            _current_span.reset(tokens[1])
+            _trace_id.reset(tokens[0])
+        _record(s)
+
+def bind_context(fn):
+    """
+    Wraps `fn` so it runs with the caller's trace context when submitted to a
+    thread pool (pool threads do not inherit context variables). Each call gets
+    its own copy, so the wrapper is safe to map over many workers at once.
+    """
+    ctx = copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+    return run
+
+def _payload_chars(value):
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+def traced_node(name):
+    """
+    Decorator for graph nodes: one "node" span per run, traced under the
+    run's thread_id. Records the node's token usage and output size.
+    The wrapped signature is preserved, so LangGraph still passes `config`.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            config = kwargs.get("config", args[0] if args else None)
+            with span(name, "node", trace_id=trace_id_from(config)) as s:
+                result = fn(state, *args, **kwargs)
+                if isinstance(result, dict):
+                    from blob_store import text_length
+                    usage = result.get("token_usage") or []
+                    messages = result.get("messages") or []
+                    s.set(
+                        prompt_tokens=sum(u.get("prompt_tokens", 0) for u in usage),
+                        completion_tokens=sum(u.get("completion_tokens", 0) for u in usage),
+                        output_chars=text_length(messages[-1].content) if messages else None,
+                    )
+                return result
+        return wrapper
+    return decorate
+
+def traced_tool(name):
+    """Decorator for tool record functions: query, result count and payload size."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(query, *args, **kwargs):
+            with span(name, "tool", query=str(query)[:200]) as s:
+                result = fn(query, *args, **kwargs)
+                s.set(results=len(result) if isinstance(result, list) else None,
+                      payload_chars=_payload_chars(result))
+                return result
+        return wrapper
+    return decorate
+
+# --- Export ---
+
+def _trace_file(day):
+    return os.path.join(TRACE_DIR, f"spans-{day}.jsonl")
+
+def _prune_files():
+    cutoff = (datetime.now() - timedelta(days=TRACE_KEEP_DAYS)).strftime("%Y-%m-%d")
+    for name in os.listdir(TRACE_DIR):
+        if name.startswith("spans-") and name.endswith(".jsonl") and name[6:16] < cutoff:
+            try:
+                os.remove(os.path.join(TRACE_DIR, name))
+            except OSError:
+                pass
+
+def _record(s):
+    global _pruned_for
+    record = s.to_dict()
+    with _recent_lock:
+        _recent.setdefault(s.trace_id, []).append(record)
+        _recent.move_to_end(s.trace_id)
+        while len(_recent) > TRACES_IN_MEMORY:
+            _recent.popitem(last=False)
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    try:
+        with _file_lock:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            if _pruned_for != today:
+                _pruned_for = today
+                _prune_files()
+            with open(_trace_file(today), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        print(f"   > [Tracing] Could not write span: {e}")
+
+def get_trace(trace_id):
+    """All spans of a trace, oldest first: from memory, else from the span files (after a restart)."""
+    with _recent_lock:
+        spans = list(_recent.get(trace_id, []))
+    if not spans and os.path.isdir(TRACE_DIR):
+        needle = f'"trace_id": {json.dumps(trace_id)}'
+        for name in sorted(os.listdir(TRACE_DIR), reverse=True):
+            if not (name.startswith("spans-") and name.endswith(".jsonl")):
+                continue
+            with open(os.path.join(TRACE_DIR, name), "r", encoding="utf-8") as f:
+                spans.extend(json.loads(line) for line in f if needle in line)
+    return sorted(spans, key=lambda sp: sp["start"])
+
+def summarize(spans):
+    """Totals per span kind plus LLM token and cache counts, for a one-line run summary."""
+    summary = {"wall_ms": 0.0, "kinds": {}, "llm_calls": 0, "llm_cache_hits": 0,
+               "prompt_tokens": 0, "completion_tokens": 0, "errors": 0}
+    if not spans:
+        return summary
+    start = min(sp["start"] for sp in spans)
+    end = max(sp["start"] + (sp["duration_ms"] or 0) / 1000 for sp in spans)
+    summary["wall_ms"] = round((end - start) * 1000, 1)
+    for sp in spans:
+        kind = summary["kinds"].setdefault(sp["kind"], {"count": 0, "total_ms": 0.0})
+        kind["count"] += 1
+        kind["total_ms"] = round(kind["total_ms"] + (sp["duration_ms"] or 0), 1)
+        summary["errors"] += sp["status"] == "error"
+        if sp["kind"] == "llm":
+            summary["llm_calls"] += 1
+            summary["llm_cache_hits"] += sp["attrs"].get("cache") in ("hit", "coalesced")
+            summary["prompt_tokens"] += sp["attrs"].get("prompt_tokens", 0)
+            summary["completion_tokens"] += sp["attrs"].get("completion_tokens", 0)
+    return summary
+
+KIND_COLORS = {"node": "#6366f1", "tool": "#10b981", "llm": "#f59e0b", "embedding": "#06b6d4", "step": "#a855f7"}
+
+def waterfall_figure(spans):
+    """Plotly waterfall: one bar per span, indented under its parent, on a shared time axis (ms)."""
+    import plotly.graph_objects as go
+
+    if not spans:
+        return go.Figure()
+    t0 = min(sp["start"] for sp in spans)
+    by_id = {sp["span_id"]: sp for sp in spans}
+
+    def depth(sp):
+        d = 0
+        while sp.get("parent_id") in by_id and d < 10:
+            sp = by_id[sp["parent_id"]]
+            d += 1
+        return d
+
+    # Children directly under their parent, siblings by start time.
+    children = {}
+    for sp in spans:
+        parent = sp["parent_id"] if sp.get("parent_id") in by_id else None
+        children.setdefault(parent, []).append(sp)
+    ordered = []
+    def walk(parent):
+        for sp in sorted(children.get(parent, []), key=lambda x: x["start"]):
+            ordered.append(sp)
+            walk(sp["span_id"])
+    walk(None)
+
+    fig = go.Figure()
+    for kind in sorted({sp["kind"] for sp in ordered}):
+        rows = [(i, sp) for i, sp in enumerate(ordered) if sp["kind"] == kind]
+        fig.add_trace(go.Bar(
+            name=kind,
+            orientation="h",
+            y=[i for i, _ in rows],
+            x=[max(sp["duration_ms"] or 0, 0.5) for _, sp in rows],
+            base=[round((sp["start"] - t0) * 1000, 1) for _, sp in rows],
+            marker_color=KIND_COLORS.get(kind, "#94a3b8"),
+            hovertext=[
+                f"{sp['name']} · {sp['duration_ms']} ms"
+                + (f" · {sp['status']}" if sp["status"] != "ok" else "")
+                + "".join(f"<br>{k}: {v}" for k, v in sp["attrs"].items())
+                for _, sp in rows
+            ],
+            hoverinfo="text",
+        ))
+    fig.update_layout(
+        barmode="overlay",
+        height=max(240, 22 * len(ordered) + 80),
+        xaxis_title="ms since start of session",
+        yaxis=dict(
+            tickvals=list(range(len(ordered))),
+            ticktext=[" " * depth(sp) + sp["name"][:40] for sp in ordered],
+            autorange="reversed",
+        ),
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=30, b=30, l=10, r=10),
+        legend=dict(orientation="h", y=1.02, x=0),
+    )
+    return fig
+
+# Test block
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    @traced_tool("web")
+    def fake_search(query):
+        return [{"title": query}] * 3
+
+    with span("Researcher", "node", trace_id="tracing_selftest") as node:
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(bind_context(fake_search), ["a", "b"]))
+        with span("llama3.2", "llm", leaf=True, cache="miss", prompt_tokens=120):
+            time.sleep(0.01)
+        node.set(prompt_tokens=120)
+    for sp in get_trace("tracing_selftest"):
+        print(sp["kind"], sp["name"], sp["duration_ms"], "ms", sp["parent_id"], sp["attrs"])
+    print(summarize(get_trace("tracing_selftest")))
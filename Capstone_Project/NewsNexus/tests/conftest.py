@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs from src/ with flat imports (see README), so the tests do too.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+import blob_store
+from blob_store import BlobMissing, is_ref, offload, offload_json, resolve, resolve_json, sweep, text_length
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(blob_store, "BLOB_MIN_CHARS", 100)
+    blob_store._load.cache_clear()
+    yield tmp_path / "blobs"
+    blob_store._load.cache_clear()
+
+def _digest(ref):
+    return ref.split(":")[1]
+
+def _age(ref, seconds):
+    path = blob_store._path(_digest(ref))
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+def test_long_text_round_trips_through_a_reference():
+    text = "<p>paragraph</p>" * 50
+    ref = offload(text)
+    assert is_ref(ref)
+    assert text_length(ref) == len(text)
+    assert resolve(ref) == text
+    assert offload(ref) == ref  # already offloaded
+
+def test_short_text_and_plain_values_stay_inline():
+    assert offload("short") == "short"
+    assert resolve("short") == "short"
+    assert offload_json([1, 2]) == [1, 2]
+    assert resolve_json([1, 2]) == [1, 2]
+
+def test_json_values_round_trip():
+    findings = [{"url": f"https://example.com/{n}", "snippet": "text " * 10} for n in range(5)]
+    ref = offload_json(findings)
+    assert is_ref(ref)
+    assert resolve_json(ref) == findings
+
+def test_identical_text_is_stored_once(blob_dir):
+    text = "same newsletter " * 20
+    assert offload(text) == offload(text)
+    assert blob_store.stats()["blobs"] == 1
+
+def test_sweep_keeps_live_and_recent_blobs():
+    live = offload("live draft " * 20)
+    recent = offload("recent but unreferenced " * 20)
+    old = offload("old and unreferenced " * 20)
+    for ref in (live, old):
+        _age(ref, blob_store.SWEEP_GRACE_SECONDS + 60)
+
+    assert sweep({_digest(live)}) == 1
+    assert resolve(live) == "live draft " * 20
+    assert resolve(recent) == "recent but unreferenced " * 20
+    with pytest.raises(BlobMissing):
+        resolve(old)
+
+def test_reusing_a_blob_refreshes_its_grace_period():
+    text = "reused section " * 20
+    ref = offload(text)
+    _age(ref, blob_store.SWEEP_GRACE_SECONDS + 60)
+    offload(text)  # written again by a new run before its checkpoint exists
+    assert sweep(set()) == 0
+    assert resolve(ref) == text
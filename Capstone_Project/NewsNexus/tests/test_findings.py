@@ -0,0 +1,33 @@
+from findings import FindingDeduper, canonical_url, dedupe_findings, make_finding
+
+def test_canonical_url_drops_tracking_params_only():
+    url = "https://www.Example.com/story/?utm_source=x&ref=home&fbclid=1&reference=keep&refid=7&id=3"
+    assert canonical_url(url) == "https://example.com/story?id=3&reference=keep&refid=7"
+
+def test_canonical_url_normalises_host_scheme_and_slash():
+    assert canonical_url("http://m.example.com/a/") == canonical_url("https://www.example.com/a")
+    assert canonical_url("https://example.com") == "https://example.com/"
+
+def test_canonical_url_keeps_file_urls_and_blanks_placeholders():
+    assert canonical_url("file:///C:/docs/report.pdf") == "file:///C:/docs/report.pdf"
+    assert canonical_url("#") == ""
+    assert canonical_url("") == ""
+
+def test_deduper_rejects_same_canonical_url():
+    deduper = FindingDeduper()
+    assert deduper.add(make_finding("https://example.com/a?utm_medium=rss", "One", "first text", "web", "q"))
+    assert not deduper.add(make_finding("https://www.example.com/a/", "Two", "other words entirely", "rss", "q"))
+
+def test_deduper_rejects_near_duplicate_text_under_another_url():
+    snippet = "Chip makers announced record quarterly revenue driven by data centre demand for AI accelerators"
+    deduper = FindingDeduper()
+    assert deduper.add(make_finding("https://a.com/1", "Record revenue", snippet, "web", "q"))
+    assert not deduper.add(make_finding("https://b.com/2", "Record revenue", snippet + " today", "web", "q"))
+    assert deduper.add(make_finding("https://c.com/3", "Unrelated", "Regulators publish new privacy guidance", "web", "q"))
+
+def test_rag_chunks_sharing_a_file_url_are_compared_on_text():
+    kept = dedupe_findings([
+        make_finding("file:///r.pdf", "r.pdf", "Section one covers adoption rates in retail banking", "rag", "q"),
+        make_finding("file:///r.pdf", "r.pdf", "Section two covers fraud losses across card networks", "rag", "q"),
+    ])
+    assert len(kept) == 2
@@ -0,0 +1,113 @@
+import sqlite3
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain_core")
+import job_server
+from job_server import Job, JobLeases, JobManager
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "leases.sqlite")
+
+def _age_lease(db_path, job_id, seconds):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE job_leases SET heartbeat = heartbeat - ? WHERE job_id = ?", (seconds, job_id))
+    conn.commit()
+    conn.close()
+
+def test_only_one_process_can_claim_a_job(db_path):
+    first, second = JobLeases(db_path), JobLeases(db_path)
+    assert first.claim("job_1", "running")
+    assert not second.claim("job_1", "running")
+    assert second.get("job_1") == ("running", first.owner)
+    assert first.get("job_1") == ("running", None)  # its own lease is not "another owner"
+    assert first.claim("job_1", "running")  # re-claiming its own lease is fine
+
+def test_released_job_can_be_claimed_by_another_process(db_path):
+    first, second = JobLeases(db_path), JobLeases(db_path)
+    first.claim("job_1", "running")
+    first.release("job_1", "review")
+    assert second.get("job_1") == ("review", None)
+    assert second.claim("job_1", "revising")
+
+def test_expired_lease_is_taken_over(db_path):
+    first, second = JobLeases(db_path), JobLeases(db_path)
+    first.claim("job_1", "running")
+    _age_lease(db_path, "job_1", job_server.JOB_LEASE_SECONDS + 1)
+    assert second.get("job_1") == ("running", None)
+    assert second.claim("job_1", "queued")
+    assert not first.claim("job_1", "running")
+    # The old owner's release must not clear the new owner's lease.
+    first.release("job_1", "failed")
+    assert first.get("job_1") == ("queued", second.owner)
+
+def test_finished_jobs_cannot_be_claimed(db_path):
+    leases = JobLeases(db_path)
+    leases.claim("job_1", "review")
+    leases.release("job_1", "approved")
+    assert not leases.claim("job_1", "revising")
+    assert JobLeases(db_path).get("job_1") == ("approved", None)
+
+def test_settings_survive_later_claims(db_path):
+    leases = JobLeases(db_path)
+    job = Job("job_1", "topic", models={"writer": {"model": "big"}}, deadline_seconds=45)
+    leases.claim(job.id, "queued", job)
+    leases.claim(job.id, "running")
+    leases.release(job.id, "review")
+    assert leases.settings(job.id) == ({"writer": {"model": "big"}}, 45)
+    assert leases.settings("job_unknown") == ({}, None)
+
+def test_settings_columns_are_added_to_an_older_table(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE job_leases (job_id TEXT PRIMARY KEY, status TEXT, owner TEXT, heartbeat REAL)")
+    conn.execute("INSERT INTO job_leases VALUES ('job_1', 'review', NULL, ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+    leases = JobLeases(db_path)
+    assert leases.settings("job_1") == ({}, None)
+    assert leases.claim("job_1", "revising")
+
+def test_wait_for_events_after_the_log_was_trimmed(monkeypatch):
+    monkeypatch.setattr(job_server, "JOB_EVENT_LIMIT", 8)
+    job = Job("job_1", "topic")
+    for n in range(25):
+        job.emit("delta", n)
+    assert job.event_count == 25
+    assert job.events_dropped + len(job.events) == 25
+    assert len(job.events) <= 8 + 8 // 4
+
+    # Resuming from before the kept window starts at the oldest kept event.
+    start, events = job.wait_for_events(0, timeout=0)
+    assert start == job.events_dropped
+    assert [data for _, data in events] == list(range(job.events_dropped, 25))
+
+    # Resuming inside the window returns exactly the events after `after`.
+    start, events = job.wait_for_events(22, timeout=0)
+    assert start == 22
+    assert [data for _, data in events] == [22, 23, 24]
+
+    # Nothing new: waits, then returns an empty batch at the current end.
+    start, events = job.wait_for_events(25, timeout=0.01)
+    assert (start, events) == (25, [])
+
+def test_resumed_job_keeps_its_models_and_deadline(db_path, monkeypatch):
+    saved = SimpleNamespace(values={"messages": [SimpleNamespace(content="topic")]}, next=("Writer",))
+    fake_agents = types.ModuleType("agents")
+    fake_agents.app = SimpleNamespace(get_state=lambda config: saved)
+    monkeypatch.setitem(sys.modules, "agents", fake_agents)
+
+    crashed = JobLeases(db_path)
+    original = Job("job_0123456789ab", "topic", models={"writer": {"model": "big"}}, deadline_seconds=45)
+    crashed.claim(original.id, "running", original)
+    _age_lease(db_path, original.id, job_server.JOB_LEASE_SECONDS + 1)
+
+    manager = JobManager(workers=1, leases=JobLeases(db_path))
+    monkeypatch.setattr(manager, "_submit", lambda fn, job, *args: None)  # don't run the pipeline
+    job = manager.get(original.id)
+    assert job.status == "queued"
+    assert (job.models, job.deadline_seconds) == ({"writer": {"model": "big"}}, 45)
@@ -1,10 +1,12 @@
 # engine.py
 from openai import OpenAI
-from templates import PROMPT_LIBRARY
+from templates import PROMPT_LIBRARY, route_task
 import sys
 
 class GemmaEngine:
-    def __init__(self):
+    def __init__(self, routes=None):
+        # Per-run model routing, e.g. {"FIX_PYTHON": {"model": "qwen2.5-coder:1.5b"}}
+        self.routes = routes or {}
         # Connect to local Ollama instance
         try:
             self.client = OpenAI(
@@ -30,16 +32,17 @@ class GemmaEngine:
         except KeyError as e:
             return f"❌ Error: Missing input data for variable {e}"
 
-        print(f"⚙️  Gemma:2b is thinking about {task_id}...")
+        model, temperature = route_task(task_id, self.routes)
+        print(f"⚙️  {model} is thinking about {task_id}...")
 
         # 3. Call the Model
         response = self.client.chat.completions.create(
-            model=config['model'],
+            model=model,
             messages=[
                 {"role": "system", "content": config['system']},
                 {"role": "user", "content": prompt}
             ],
-            temperature=config['temperature'],
+            temperature=temperature,
         )
 
         return response.choices[0].message.content
\ No newline at end of file
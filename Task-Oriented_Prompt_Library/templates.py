@@ -1,11 +1,17 @@
 # templates.py
+import os
+
+# Model routing: every task runs on gemma:2b unless told otherwise.
+# PROMPT_LIBRARY_MODEL switches all tasks; PROMPT_LIBRARY_MODEL_<TASK_ID>
+# (e.g. PROMPT_LIBRARY_MODEL_FIX_PYTHON) switches a single task.
+DEFAULT_MODEL = os.getenv("PROMPT_LIBRARY_MODEL", "gemma:2b")
 
 PROMPT_LIBRARY = {
     
     # Task 1: The Email Summarizer
     # Gemma:2b is small, so we give it very clear, short instructions.
     "SUMMARIZE_EMAIL": {
-        "model": "gemma:2b",
+        "model": DEFAULT_MODEL,
         "temperature": 0.2, 
         "system": (
             "You are a helpful assistant. "
@@ -17,7 +23,7 @@ PROMPT_LIBRARY = {
 
     # Task 2: The Python Bug Fixer
     "FIX_PYTHON": {
-        "model": "gemma:2b",
+        "model": DEFAULT_MODEL,
         "temperature": 0.1, # Low temp for code accuracy
         "system": (
             "You are a Python Expert. "
@@ -29,7 +35,7 @@ PROMPT_LIBRARY = {
 
     # Task 3: The Keyword Extractor (Structured Output)
     "EXTRACT_KEYWORDS": {
-        "model": "gemma:2b",
+        "model": DEFAULT_MODEL,
         "temperature": 0.0,
         "system": (
             "You are a data extractor. "
@@ -38,4 +44,16 @@ PROMPT_LIBRARY = {
         ),
         "user_template": "Text: {input_text}"
     }
-}
\ No newline at end of file
+}
+
+
+def route_task(task_id, overrides=None):
+    """
+    Returns (model, temperature) for a task: the library entry, then the
+    environment, then per-run overrides ({task_id: {"model": ..., "temperature": ...}}).
+    """
+    config = PROMPT_LIBRARY[task_id]
+    model = os.getenv(f"PROMPT_LIBRARY_MODEL_{task_id}", config["model"])
+    temperature = config["temperature"]
+    override = (overrides or {}).get(task_id, {})
+    return override.get("model", model), override.get("temperature", temperature)